@@ -0,0 +1,75 @@
+from collections import deque
+
+# ================= 通過詞索引 (抓包編輯 / 刪除用) =================
+# discord.py 的 on_message_edit / on_message_delete 只有訊息還在它的訊息快取裡才會觸發，
+# 快取滿了或重啟過，舊訊息被改 / 被刪就抓不到；改聽 raw 事件又只拿得到訊息 ID，
+# 要知道「這則是不是通過的詞」就得 fetch_message 打一次 REST。
+# 這裡自己記：每個頻道最近 per_channel 個被 ✅ 的詞 (訊息 ID -> 內容、作者)，
+# 裁判判過就寫進來，raw 事件直接用訊息 ID 查，O(1)、不打 REST。
+# 重啟後第一次查到某個頻道時，從 word_log 把那個頻道最近的詞補回來。
+
+
+class AcceptedWord:
+    __slots__ = ("channel_id", "content", "author_id", "author_name")
+
+    def __init__(self, channel_id, content, author_id=None, author_name=None):
+        self.channel_id = channel_id
+        self.content = content
+        self.author_id = author_id
+        self.author_name = author_name  # 從 word_log 補回來的沒有名字
+
+
+class AcceptedIndex:
+    def __init__(self, per_channel=500, loader=None):
+        self.per_channel = per_channel
+        self.loader = loader        # loader(channel_id, limit) -> [(訊息ID, 內容, 作者ID)]，由新到舊
+        self._words = {}            # message_id -> AcceptedWord
+        self._order = {}            # channel_id -> deque[message_id]，舊的在前
+        self._loaded = set()        # 已經從 word_log 補過的頻道
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, channel_id, message_id, content, author_id=None, author_name=None):
+        """ 裁判判通過時呼叫；超過每個頻道的上限就丟掉最舊的 """
+        if message_id in self._words:
+            return
+        self._words[message_id] = AcceptedWord(channel_id, content, author_id, author_name)
+        order = self._order.setdefault(channel_id, deque())
+        order.append(message_id)
+        while len(order) > self.per_channel:
+            self._words.pop(order.popleft(), None)
+
+    def get(self, channel_id, message_id):
+        """ 這則訊息是不是通過的詞；不是回傳 None """
+        self._ensure_loaded(channel_id)
+        word = self._words.get(message_id)
+        return word if word is not None and word.channel_id == channel_id else None
+
+    def pop(self, channel_id, message_id):
+        """ 訊息被刪掉：從索引拿掉並回傳 (不是通過的詞回傳 None) """
+        word = self.get(channel_id, message_id)
+        if word is not None:
+            del self._words[message_id]
+            # 也要從 deque 拿掉，不然死掉的 ID 還佔著 per_channel 的名額，活著的詞會被提早擠掉
+            # (最多 per_channel 個，刪訊息又不常見，線性掃一次沒關係)
+            self._order[channel_id].remove(message_id)
+        return word
+
+    def forget_channel(self, channel_id):
+        for message_id in self._order.pop(channel_id, ()):
+            self._words.pop(message_id, None)
+        self._loaded.discard(channel_id)
+
+    def _ensure_loaded(self, channel_id):
+        if channel_id in self._loaded or self.loader is None:
+            return
+        self._loaded.add(channel_id)
+        order = self._order.setdefault(channel_id, deque())
+        # 補回來的都比目前記著的舊，從前面塞，塞滿為止
+        for message_id, content, author_id in self.loader(channel_id, self.per_channel):
+            if len(order) >= self.per_channel:
+                break
+            if message_id not in self._words:
+                self._words[message_id] = AcceptedWord(channel_id, content, author_id)
+                order.appendleft(message_id)
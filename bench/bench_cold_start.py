@@ -0,0 +1,68 @@
+""" 冷啟動時間測試
+
+每一輪都開一個新的 Python 行程 (沒有任何模組快取)，量：
+  - import dc / bot_core (應該只載入 discord.py，不建立任何 client)
+  - create_bot()
+  - 各 cog 單獨載入 (setup_hook 裡做的事)
+  - 第一次用到 LLM 閘道 (這時才 import Groq SDK)
+不會登入 Discord，資料庫用 :memory:。取每一項的中位數。
+
+    python bench/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, json, time
+timings = {}
+start = time.perf_counter()
+import dc
+timings["import dc"] = time.perf_counter() - start
+
+from bot_config import BotConfig, ALL_COGS
+from bot_core import create_bot
+
+async def main():
+    start = time.perf_counter()
+    bot = create_bot(BotConfig(db_path=":memory:", health_port=None, cogs=(), groq_api_key="fake"))
+    timings["create_bot()"] = time.perf_counter() - start
+    async with bot:
+        for name in ALL_COGS:
+            start = time.perf_counter()
+            await bot.load_extension(f"cogs.{name}")
+            timings[f"load cogs.{name}"] = time.perf_counter() - start
+        start = time.perf_counter()
+        bot.llm
+        timings["first use: llm"] = time.perf_counter() - start
+
+asyncio.run(main())
+print(json.dumps(timings))
+"""
+
+
+def main(args):
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    print(f"{args.runs} 個新行程，取中位數")
+    print(f"{'步驟':<20} | {'耗時':>10}")
+    total = 0.0
+    for step in runs[0]:
+        value = statistics.median(run[step] for run in runs)
+        total += value
+        print(f"{step:<22} | {value * 1000:>7.1f} ms")
+    print(f"{'合計':<20} | {total * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+""" 接龍裁判批次測試
+
+假 Groq 伺服器 (固定延遲 + 每個輸出字的生成時間)，模擬 N 個同時活躍的接龍頻道，
+每個頻道一個接一個送新詞 (跟正式的頻道佇列一樣要等上一個判完)，
+直接呼叫正式的 Game.judge_word，比較「一詞一次」和不同批次視窗 / 批次大小：
+每秒判幾個詞、每個詞的 p50 / p99 延遲、總共打了幾次 LLM。
+
+    python bench/bench_judge_batch.py --channels 1 10 50 --words 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_config import BotConfig
+from bot_core import create_bot
+from fake_groq import FakeGroqServer
+
+# (名稱, 批次視窗秒數, 批次大小)；視窗 0 = 一詞一次
+SETTINGS = [("一詞一次", 0, 1), ("5ms / 8", 0.005, 8), ("20ms / 16", 0.02, 16), ("50ms / 32", 0.05, 32)]
+
+REASON = "這是什麼火星文，國文老師看了都想哭"
+
+
+def respond(messages):
+    """ 單詞回一筆判決，批次就每個編號各回一筆 (偶數編號拒絕) """
+    if messages[0]["role"] != "system" or "verdicts" not in messages[0]["content"]:
+        return json.dumps({"ok": True, "reason": ""}, ensure_ascii=False)
+    ids = [int(n) for n in re.findall(r"^(\d+)\. ", messages[-1]["content"], re.M)]
+    return json.dumps({"verdicts": [{"id": i, "ok": i % 2 == 1, "reason": "" if i % 2 else REASON} for i in ids]},
+                      ensure_ascii=False)
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1] if len(values) > 1 else values[0]
+
+
+async def run_case(server, channels, words, window, size, max_in_flight):
+    config = BotConfig(db_path=":memory:", health_port=None, cogs=("game",), lexicon_path="",
+                       groq_api_key="fake", groq_base_url=server.base_url, llm_max_in_flight=max_in_flight,
+                       judge_batch_window=window, judge_batch_size=size)
+    bot = create_bot(config)
+    latencies = []
+    async with bot:
+        await bot.setup_hook()
+        game = bot.get_cog("Game")
+        requests = server.requests
+
+        async def channel(c):
+            for i in range(words):
+                start = time.perf_counter()
+                await game.judge_word(f"頻道{c}的第{i}個詞")  # 每個詞都不一樣，不會吃到快取
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(channel(c) for c in range(channels)))
+        elapsed = time.perf_counter() - start
+        calls = server.requests - requests
+    return len(latencies) / elapsed, percentile(latencies, 50), percentile(latencies, 99), calls
+
+
+async def main(args):
+    with FakeGroqServer(latency=args.latency, char_latency=args.char_latency, responder=respond) as server:
+        print(f"假 LLM 延遲 {args.latency * 1000:.0f} ms + 每字 {args.char_latency * 1000:.1f} ms，"
+              f"LLM 同時請求上限 {args.max_in_flight}，每頻道 {args.words} 個詞")
+        print(f"{'頻道':>4} | {'設定':<10} | {'詞/秒':>8} | {'p50':>8} | {'p99':>8} | {'LLM 呼叫':>8}")
+        for channels in args.channels:
+            for name, window, size in SETTINGS:
+                rate, p50, p99, calls = await run_case(server, channels, args.words, window, size, args.max_in_flight)
+                print(f"{channels:>6} | {name:<12} | {rate:>9.1f} | {p50 * 1000:>5.0f} ms | {p99 * 1000:>5.0f} ms | {calls:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--char-latency", type=float, default=0.0005)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
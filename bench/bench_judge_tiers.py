@@ -0,0 +1,79 @@
+""" 接龍裁判分層測試
+
+把一份錄下來的詞彙 (一行一個詞) 依序丟給正式的裁判 (cogs.game)：
+本機詞庫 -> 亂打偵測 -> 裁判快取 -> LLM (假 Groq 伺服器)，
+統計有多少比例的詞最後真的送到 LLM，以及每一層的 p50 / p99 延遲。
+
+    python bench/bench_judge_tiers.py --corpus bench/data/word_corpus.txt --lexicon bench/data/lexicon_sample.txt
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_config import BotConfig
+from bot_core import create_bot
+from fake_groq import FakeGroqServer
+from lexicon import build_lexicon
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, p):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        lexicon_path = os.path.join(tmp, "lexicon.txt")
+        build_lexicon(args.lexicon, lexicon_path)
+
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+
+        latencies = {"lexicon": [], "gibberish": [], "cache": [], "llm": []}
+        with FakeGroqServer(latency=args.latency) as server:
+            # 只載入接龍 cog，直接呼叫正式的裁判
+            bot = create_bot(BotConfig(db_path=":memory:", health_port=None, cogs=("game",), lexicon_path=lexicon_path,
+                                       groq_api_key="fake", groq_base_url=server.base_url))
+            async with bot:  # 不登入 Discord，只跑 setup_hook 載入 cog
+                await bot.setup_hook()
+                game = bot.get_cog("Game")
+                for word in corpus:
+                    local = game.lexicon.classify(word)
+                    cache_hits = game.verdict_cache.hits
+                    start = time.perf_counter()
+                    await game.judge_word(word)
+                    elapsed = time.perf_counter() - start
+                    if local is not None:
+                        latencies["lexicon" if local else "gibberish"].append(elapsed)
+                    elif game.verdict_cache.hits > cache_hits:
+                        latencies["cache"].append(elapsed)
+                    else:
+                        latencies["llm"].append(elapsed)
+
+    total = len(corpus)
+    print(f"語料 {total} 個詞，假 LLM 延遲 {args.latency * 1000:.0f} ms")
+    print(f"{'層級':<10} | {'數量':>5} | {'比例':>6} | {'p50':>10} | {'p99':>10}")
+    for tier, values in latencies.items():
+        if not values:
+            print(f"{tier:<10} | {0:>5} | {0:>6.1%} | {'-':>10} | {'-':>10}")
+            continue
+        print(f"{tier:<10} | {len(values):>5} | {len(values) / total:>6.1%} | "
+              f"{percentile(values, 50) * 1e6:>7.1f} us | {percentile(values, 99) * 1e6:>7.1f} us")
+    print(f"送到 LLM 的比例：{len(latencies['llm']) / total:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(HERE, "data", "word_corpus.txt"), help="錄下來的詞彙，一行一個")
+    parser.add_argument("--lexicon", default=os.path.join(HERE, "data", "lexicon_sample.txt"), help="原始詞表，一行一個")
+    parser.add_argument("--latency", type=float, default=0.2, help="假 Groq 每次回應的延遲 (秒)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+""" LLM 閘道吞吐量測試
+
+用假 Groq 伺服器 (固定延遲) 模擬 1 / 10 / 100 個同時活躍的頻道，
+每個頻道一則一則送訊息 (跟接龍裁判一樣要等上一則判完)，統計每秒處理幾則訊息，
+同時量測事件迴圈延遲，對照舊的「直接在事件迴圈上同步呼叫」寫法。
+
+    python bench/bench_llm_gateway.py --latency 0.2 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_groq import FakeGroqServer
+from llm_gateway import LLMGateway
+
+MESSAGES = [{"role": "user", "content": "龍棲息在地上"}]
+
+
+async def sample_loop_lag(stop, samples, interval=0.05):
+    """ 每 interval 秒醒來一次，記錄實際多睡了多久 """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_case(channels, duration, call):
+    handled = 0
+    stop = asyncio.Event()
+    lag = []
+
+    async def channel_worker():
+        nonlocal handled
+        while not stop.is_set():
+            await call()
+            handled += 1
+            await asyncio.sleep(0)  # 真實的 handler 之後還會 await add_reaction 等等
+
+    lag_task = asyncio.create_task(sample_loop_lag(stop, lag))
+    workers = [asyncio.create_task(channel_worker()) for _ in range(channels)]
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+    await lag_task
+    return handled / elapsed, max(lag) if lag else 0.0
+
+
+async def main(args):
+    with FakeGroqServer(latency=args.latency) as server:
+        gateway = LLMGateway(api_key="fake", base_url=server.base_url,
+                             max_in_flight=args.max_in_flight, timeout=30)
+
+        async def via_gateway():
+            await gateway.complete(messages=MESSAGES, temperature=0.2)
+
+        async def blocking():
+            # 舊寫法：同步 client 直接在事件迴圈上跑
+            gateway.client.chat.completions.create(messages=MESSAGES, model="llama-3.3-70b-versatile", temperature=0.2)
+
+        print(f"假 Groq 延遲 {args.latency * 1000:.0f} ms，in-flight 上限 {args.max_in_flight}，每組 {args.duration:g} 秒")
+        print(f"{'頻道數':>6} | {'模式':<8} | {'訊息/秒':>8} | {'最大迴圈延遲':>10}")
+        for channels in args.channels:
+            for name, call in (("blocking", blocking), ("gateway", via_gateway)):
+                if name == "blocking" and channels > 10 and not args.all_blocking:
+                    continue
+                rate, max_lag = await run_case(channels, args.duration, call)
+                print(f"{channels:>6} | {name:<8} | {rate:>8.1f} | {max_lag * 1000:>8.0f} ms")
+        gateway.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="假 Groq 每次回應的延遲 (秒)")
+    parser.add_argument("--duration", type=float, default=5.0, help="每組測試跑幾秒")
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--all-blocking", action="store_true", help="100 頻道也跑舊的阻塞寫法 (很慢)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+""" on_message 熱路徑微測試：一般頻道的訊息 + 客服單臨時按鈕檢查
+
+用 bench/fake_discord.py 的假伺服器 / 假頻道，直接呼叫正式的 DiscordBot.on_message 和 Tickets.on_message，
+模擬大量一般頻道的訊息 (其中極少數是還掛著紅色按鈕的客服單)：
+  - 每則訊息在兩個 listener 各花多少時間
+  - 跑完後記憶體裡留了幾筆頻道設定 (一般頻道不應該建設定)
+  - 紅色按鈕是不是在開單者第一次說話時就被拿掉 (而且只拿一次)
+有任何一項不對就 assert 失敗，熱路徑改壞了會直接抓到。
+
+    python bench/bench_on_message_hot_path.py --messages 200000 --channels 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_config import BotConfig
+from bot_core import create_bot
+from fake_discord import FakeGuild, FakeHTTP, FakeMessage, FakeUser
+
+
+async def run(args):
+    random.seed(1)
+    bot = create_bot(BotConfig(db_path=":memory:", health_port=None, cogs=("tickets",)))
+    async with bot:  # 不登入 Discord，只跑 setup_hook 載入 cog
+        await bot.setup_hook()
+        guild = FakeGuild(FakeHTTP(latency=0))
+        channels = [guild.add_text_channel(f"channel-{i}") for i in range(args.channels)]
+        bot.topic_index.build([guild])
+        bot._connection.user = guild.me  # 沒有真的登入，補上 READY 時才會有的機器人帳號
+        bot._connection._add_guild(guild)
+
+        # 少數頻道是還掛著紅色按鈕的客服單
+        registry = bot.ticket_registry
+        owners = {}
+        for channel in random.sample(channels, args.tickets):
+            owners[channel.id] = FakeUser(f"owner-{channel.name}")
+            panel = await channel.send("panel")
+            registry.set_temp_button(channel.id, owners[channel.id].id, panel.id)
+
+        users = [FakeUser(f"user-{i}") for i in range(5000)]
+        traffic = []
+        for _ in range(args.messages):
+            channel = random.choice(channels)
+            owner = owners.get(channel.id)
+            author = owner if owner is not None and random.random() < 0.5 else random.choice(users)
+            traffic.append(FakeMessage(channel, author=author, content="大家好"))
+        spoke = {m.channel.id for m in traffic if owners.get(m.channel.id) is m.author}
+
+        tickets = bot.get_cog("Tickets")
+        outbound = bot.outbound
+        submitted = 0
+        submit = outbound.submit
+
+        def counting_submit(*a, **kw):
+            nonlocal submitted
+            submitted += 1
+            return submit(*a, **kw)
+
+        outbound.submit = counting_submit
+
+        start = time.perf_counter()
+        for message in traffic:
+            await bot.on_message(message)
+        core_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for message in traffic:
+            await tickets.on_message(message)
+        tickets_time = time.perf_counter() - start
+
+        configs = len(bot.channel_store._configs)
+        remaining = registry.pending_temp_buttons
+
+    assert configs == 0, f"一般頻道不應該建立頻道設定，結果建了 {configs} 筆"
+    assert submitted == len(spoke), f"應該拿掉 {len(spoke)} 個紅色按鈕，結果排了 {submitted} 次"
+    assert remaining == args.tickets - len(spoke)
+
+    print(f"{args.messages} 則訊息、{args.channels} 個頻道，其中 {args.tickets} 個客服單還掛著紅色按鈕")
+    print(f"{'listener':<22} | {'每則耗時':>10}")
+    print(f"{'DiscordBot.on_message':<22} | {core_time / args.messages * 1e9:>7.0f} ns")
+    print(f"{'Tickets.on_message':<22} | {tickets_time / args.messages * 1e9:>7.0f} ns")
+    print(f"留在記憶體的頻道設定 {configs} 筆；拿掉紅色按鈕 {submitted} 個，還掛著 {remaining} 個")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--channels", type=int, default=20000)
+    parser.add_argument("--tickets", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,83 @@
+""" 開客服單延遲測試
+
+用假的 Discord REST 層 (每次呼叫固定延遲) 比較兩種開單流程：
+  - legacy：用顯示名稱在所有頻道裡線性搜尋重複單 + 建頻道 + 4 則訊息
+  - panel ：正式的開單流程 (cogs.tickets)：查客服單登記簿 + 建頻道 + 1 則整合面板
+統計每次開單的 REST 呼叫數與 p50 / p99 延遲。
+
+    python bench/bench_ticket_open.py --latency 0.08 --channels 500 --tickets 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from bot_config import BotConfig
+from bot_core import create_bot
+from cogs.tickets import TicketLauncher
+from fake_discord import FakeHTTP, FakeGuild, FakeInteraction, FakeUser
+
+
+def embeds_for(user):
+    return [
+        discord.Embed(title="新的客服單已開啟", description=f"開啟者: {user.display_name}"),
+        discord.Embed(title="🔒 管理員控制台"),
+        discord.Embed(description="退出此頻道"),
+        discord.Embed(description=f"🛑 {user.mention} 專用選項"),
+    ]
+
+
+async def open_legacy(interaction):
+    await interaction.response.defer(ephemeral=True)
+    guild = interaction.guild
+    ticket_name = f"客服單：{interaction.user.display_name.lower()}"
+    if discord.utils.get(guild.channels, name=ticket_name):
+        await interaction.followup.send("已經有客服單")
+        return
+    chan = await guild.create_text_channel(name=ticket_name, category=interaction.channel.category)
+    for embed in embeds_for(interaction.user):
+        await chan.send(content=interaction.user.mention, embed=embed)
+    await interaction.followup.send("✅ 客服單已建立")
+
+
+async def open_panel(interaction):
+    # 正式的開單流程 (cogs.tickets 的綠色按鈕)
+    await TicketLauncher().create_ticket_button.callback(interaction)
+
+
+async def run(name, flow, args, client=None):
+    http = FakeHTTP(latency=args.latency)
+    guild = FakeGuild(http, channel_count=args.channels)
+    lobby = guild.channels[0]
+    latencies = []
+    for i in range(args.tickets):
+        interaction = FakeInteraction(guild, lobby, FakeUser(f"user{i}"), client=client)
+        start = time.perf_counter()
+        await flow(interaction)
+        latencies.append(time.perf_counter() - start)
+    p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98]
+    print(f"{name:<7} | {http.total / args.tickets:>8.1f} | {statistics.median(latencies) * 1000:>8.0f} ms | {p99 * 1000:>8.0f} ms")
+
+
+async def main(args):
+    bot = create_bot(BotConfig(db_path=":memory:", health_port=None, cogs=("tickets",)))
+    async with bot:  # 不登入 Discord，只跑 setup_hook 載入 cog
+        await bot.setup_hook()
+        print(f"假 REST 延遲 {args.latency * 1000:.0f} ms，伺服器 {args.channels} 個頻道，開 {args.tickets} 張單")
+        print(f"{'流程':<7} | {'REST/張':>8} | {'p50':>11} | {'p99':>11}")
+        await run("legacy", open_legacy, args)
+        await run("panel", open_panel, args, client=bot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.08, help="每次 REST 呼叫的延遲 (秒)")
+    parser.add_argument("--channels", type=int, default=500, help="伺服器裡已經有幾個頻道")
+    parser.add_argument("--tickets", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
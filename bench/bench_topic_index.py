@@ -0,0 +1,102 @@
+""" 頻道主題索引測試
+
+模擬 1,000 個伺服器 × 每個 200 個頻道，比較舊的「全部掃一遍比對 topic」
+跟新的 TopicIndex 在三種查詢上的耗時：
+  - 每日故事：找每個伺服器的故事頻道 + 所有接龍頻道
+  - 故事測試：找單一伺服器的接龍/測試頻道
+  - on_message：判斷訊息所在頻道的用途
+
+    python bench/bench_topic_index.py --guilds 1000 --channels 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topic_index import TopicIndex, GAME, STORY_OUTPUT, STORY_TEST, STORY_TOPIC, TOPIC_ROLES
+
+
+def build_guilds(guild_count, channel_count):
+    random.seed(42)
+    special = list(TOPIC_ROLES)
+    guilds = []
+    next_id = 1
+    for g in range(guild_count):
+        guild = SimpleNamespace(id=g, text_channels=[])
+        for _ in range(channel_count):
+            topic = random.choice(special) if random.random() < 0.02 else f"一般聊天 {next_id}"
+            guild.text_channels.append(SimpleNamespace(id=next_id, guild=guild, topic=topic, name=f"ch-{next_id}"))
+            next_id += 1
+        guilds.append(guild)
+    return guilds
+
+
+def scan_story(guilds):
+    outputs = {}
+    for guild in guilds:
+        for channel in guild.text_channels:
+            if channel.topic == STORY_TOPIC:
+                outputs[guild.id] = channel
+                break
+    games = [c for guild in guilds for c in guild.text_channels if c.topic == "【接龍模式】"]
+    return outputs, games
+
+
+def index_story(index, guilds):
+    outputs = {}
+    for guild in guilds:
+        channel = index.first(STORY_OUTPUT, guild.id)
+        if channel:
+            outputs[guild.id] = channel
+    return outputs, index.channels(GAME)
+
+
+def scan_test(guild):
+    return [c for c in guild.text_channels if c.topic in ["【接龍模式】", "【故事測試】"]]
+
+
+def index_test(index, guild):
+    return index.channels(GAME, guild.id) + index.channels(STORY_TEST, guild.id)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(args):
+    guilds = build_guilds(args.guilds, args.channels)
+    all_channels = [c for g in guilds for c in g.text_channels]
+    index = TopicIndex()
+    build_time = timed(lambda: index.build(guilds), 1)
+    assert scan_story(guilds)[0].keys() == index_story(index, guilds)[0].keys()
+
+    sample_guilds = random.sample(guilds, min(100, len(guilds)))
+    sample_channels = random.sample(all_channels, min(10000, len(all_channels)))
+
+    rows = [
+        ("每日故事 (全伺服器)", timed(lambda: scan_story(guilds), 3), timed(lambda: index_story(index, guilds), 3)),
+        ("故事測試 (單一伺服器)",
+         timed(lambda: [scan_test(g) for g in sample_guilds], 3) / len(sample_guilds),
+         timed(lambda: [index_test(index, g) for g in sample_guilds], 3) / len(sample_guilds)),
+        ("on_message 判斷用途",
+         timed(lambda: [c.topic == STORY_TOPIC or c.topic == "【接龍模式】" for c in sample_channels], 3) / len(sample_channels),
+         timed(lambda: [index.role_of(c.id) for c in sample_channels], 3) / len(sample_channels)),
+    ]
+    print(f"{args.guilds} 個伺服器 × {args.channels} 個頻道 = {len(all_channels)} 個頻道，索引建立耗時 {build_time * 1000:.1f} ms")
+    print(f"{'查詢':<16} | {'全部掃描':>12} | {'索引':>12} | {'加速':>8}")
+    for name, scan, indexed in rows:
+        print(f"{name:<16} | {scan * 1e6:>9.1f} us | {indexed * 1e6:>9.2f} us | {scan / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--channels", type=int, default=200)
+    main(parser.parse_args())
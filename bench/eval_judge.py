@@ -0,0 +1,164 @@
+""" 接龍裁判 prompt 離線評估
+
+拿一份標註好的詞 (詞<TAB>YES/NO)，分別用舊版 prompt (每次整段規則塞進 user turn，
+startswith("YES") 解析) 和新版 judge.py (固定 system message + JSON 判決) 問同一個模型，
+比較準確率、解析失敗數、每次呼叫的 prompt / completion token 與延遲。
+
+    GROQ_API_KEY=... python bench/eval_judge.py --model llama-3.1-8b-instant
+    python bench/eval_judge.py --fake   # 不連網：假伺服器照標註回答，只比 token 與解析 (token 以字元數計)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import judge
+from fake_groq import FakeGroqServer
+from llm_gateway import LLMGateway
+from model_router import SMALL_MODEL
+from story_chunking import estimate_tokens
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ================= 舊版裁判 (對照組) =================
+def build_legacy_prompt(current_word):
+    return f"""
+        你現在不是人類導師，而是一個【嚴格的中文語法結構檢測機】。
+
+        使用者輸入：「{current_word}」
+
+        你的任務是判斷：**這串文字的「詞彙」是否存在？且「排列結構」是否符合中文語法？**
+
+        【最高指導原則 - 絕對不要做的事】：
+        1. ❌ **絕對不要** 檢查現實邏輯！不要管龍是否真的存在，不要管混凝土能不能吃。
+        2. ❌ **絕對不要** 因為「不夠真實」或「像是科幻情節」而拒絕。
+        3. ❌ **絕對不要** 當科普老師。
+
+        【審核標準】：
+        1. ✅ **通過 (YES)**：
+           - 只要詞彙是真實存在的，且排列符合中文文法（主詞+動詞+受詞 / 形容詞+名詞），**即使邏輯荒謬也要通過**。
+           - 範例通過：「龍棲息在地上」 (龍/棲息/地上 都是真實詞彙，文法正確 -> YES)
+           - 範例通過：「義大利麵拌42號混凝土」 (名詞+動詞+名詞，文法正確 -> YES)
+           - 範例通過：「我把太陽一口吞了」 (超現實但文法正確 -> YES)
+
+        2. ❌ **不通過 (NO)**：
+           - 只有在「詞彙根本不存在（亂打）」或「文法完全破碎」時才拒絕。
+           - 範例拒絕：「能季去次」 (無意義亂詞 -> NO)
+           - 範例拒絕：「大大大吃吃吃」 (贅字堆疊 -> NO)
+           - 範例拒絕：「森林跑去兔子」 (文法結構錯誤 -> NO)
+           ❌ **拒絕「亂造詞」** (詞彙搭配必須合理)：
+           - 即使每個字都認識，但合在一起**不是一個習慣用語**，或者**詞性搭配極度怪異**，必須拒絕。
+           - 範例拒絕：「上米」 ("上"跟"米"都認識，但沒人這樣講 -> NO)
+           - 範例拒絕：「能季」 (無意義組合 -> NO)
+           - 範例拒絕：「什好」 (語意不清 -> NO)
+        3. 注意:
+            如「游泳」、「喜歡」可以是名詞也能是動詞，詞性請根據上下文判斷。
+        【回應格式】：
+        1. 通過 -> 只回傳 "YES"。
+        2. 不通過 -> 回傳 "NO" 並且「狠狠地酸他一句」(請發揮毒舌創意，酸他的"詞彙貧乏"或"亂打字"，但不要酸他的邏輯，字數限制20~35字)。
+        """
+
+
+def parse_legacy(text):
+    text = text.strip()
+    if text.startswith("YES"):
+        return True, ""
+    if text.startswith("NO"):
+        return False, text[2:].strip()
+    return None  # 舊版會把這種回應當成拒絕
+
+
+VARIANTS = {
+    "legacy": (lambda word: [{"role": "user", "content": build_legacy_prompt(word)}], {"temperature": 0.2}, parse_legacy),
+    "compact": (judge.build_judge_messages, judge.REQUEST_OPTIONS, judge.parse_verdict),
+}
+
+
+def load_labels(path):
+    labels = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            word, label = line.split("\t")
+            labels.append((word, label.strip().upper() == "YES"))
+    return labels
+
+
+def oracle(labels):
+    """ 假伺服器用：照標註回答，格式跟著 prompt 走 (有 system message 就回 JSON) """
+    answers = dict(labels)
+
+    def respond(messages):
+        if messages[0]["role"] == "system":
+            ok = answers.get(messages[-1]["content"], False)
+            return '{"ok": true, "reason": ""}' if ok else '{"ok": false, "reason": "這是什麼火星文，國文老師看了都想哭"}'
+        content = messages[-1]["content"]
+        word = content.split("使用者輸入：「", 1)[1].split("」", 1)[0]
+        return "YES" if answers.get(word, False) else "NO 這是什麼火星文，國文老師看了都想哭"
+    return respond
+
+
+async def evaluate(gateway, model, labels, variant, concurrency):
+    build, options, parse = VARIANTS[variant]
+    slots = asyncio.Semaphore(concurrency)
+    rows = []
+
+    async def one(word, expected):
+        messages = build(word)
+        async with slots:
+            start = time.perf_counter()
+            completion = await gateway.complete(messages, model=model, **options)
+            elapsed = time.perf_counter() - start
+        verdict = parse(completion.choices[0].message.content)
+        usage = completion.usage
+        rows.append({
+            "correct": verdict is not None and verdict[0] == expected,
+            "unparsed": verdict is None,
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            "estimated": sum(estimate_tokens(m["content"]) for m in messages),
+            "seconds": elapsed,
+        })
+
+    await asyncio.gather(*(one(word, expected) for word, expected in labels))
+    return rows
+
+
+async def main(args):
+    labels = load_labels(args.labels)
+    server = FakeGroqServer(latency=0.05, responder=oracle(labels)) if args.fake else None
+    if server:
+        server.start()
+    try:
+        gateway = LLMGateway(api_key="fake" if server else os.environ.get("GROQ_API_KEY"),
+                             base_url=server.base_url if server else None, max_in_flight=args.concurrency)
+        print(f"{len(labels)} 個標註詞，模型 {args.model}{' (假伺服器)' if server else ''}")
+        print(f"{'版本':<8} | {'準確率':>7} | {'解析失敗':>6} | {'prompt tok':>10} | {'completion tok':>14} | {'本機估算':>8} | {'p50':>8}")
+        for variant in VARIANTS:
+            rows = await evaluate(gateway, args.model, labels, variant, args.concurrency)
+            n = len(rows)
+            print(f"{variant:<10} | {sum(r['correct'] for r in rows) / n:>8.1%} | {sum(r['unparsed'] for r in rows):>10} | "
+                  f"{statistics.mean(r['prompt_tokens'] for r in rows):>10.1f} | "
+                  f"{statistics.mean(r['completion_tokens'] for r in rows):>14.1f} | "
+                  f"{statistics.mean(r['estimated'] for r in rows):>12.1f} | "
+                  f"{statistics.median(r['seconds'] for r in rows) * 1000:>6.0f} ms")
+        gateway.close()
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", default=os.path.join(HERE, "data", "judge_labels.tsv"))
+    parser.add_argument("--model", default=SMALL_MODEL)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fake", action="store_true", help="用本機假伺服器 (不連網)")
+    asyncio.run(main(parser.parse_args()))
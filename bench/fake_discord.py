@@ -0,0 +1,206 @@
+""" 假的 Discord REST 層：給 benchmark 用，每次呼叫都等固定延遲並記錄次數 """
+import asyncio
+import datetime
+import itertools
+import random
+import time
+from collections import Counter
+
+import discord
+
+_ids = itertools.count(10_000)
+
+
+def next_id():
+    return next(_ids)
+
+
+class FakeHTTP:
+    def __init__(self, latency=0.08, rate_limit=0.0, retry_after=0.5, seed=0):
+        self.latency = latency
+        self.rate_limit = rate_limit      # 每次呼叫被 429 的機率
+        self.retry_after = retry_after    # 被 429 時要等多久 (discord.py 會照 Retry-After 等完自己重送)
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self._random = random.Random(seed)
+
+    async def request(self, route):
+        self.calls[route] += 1
+        while self.rate_limit and self._random.random() < self.rate_limit:
+            self.rate_limited[route] += 1
+            await asyncio.sleep(self.retry_after)
+        await asyncio.sleep(self.latency)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+class FakeUser:
+    def __init__(self, name, bot=False):
+        self.id = next_id()
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+
+
+class FakeMessage:
+    _state = None  # commands.Context 會讀，假訊息用不到
+
+    def __init__(self, channel, author=None, content="", embeds=None, view=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.embeds = embeds or []
+        self.view = view
+        self.reactions = []
+        self.reacted_at = None  # 機器人第一次加反應的時間 (壓測用來算接龍的回應延遲)
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+
+    async def edit(self, **kwargs):
+        await self.channel.http.request("edit")
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        return self
+
+    async def delete(self):
+        await self.channel.http.request("delete")
+        self.channel.messages.pop(self.id, None)
+
+    async def add_reaction(self, emoji):
+        await self.channel.http.request("reaction")
+        self.reactions.append(FakeReaction(emoji))
+        if self.reacted_at is None:
+            self.reacted_at = time.perf_counter()
+
+
+class FakeReaction:
+    def __init__(self, emoji, me=True):
+        self.emoji = emoji
+        self.me = me
+
+
+class FakeChannel:
+    def __init__(self, guild, name, http, topic=None, category=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.http = http
+        self.topic = topic
+        self.category = category
+        self.mention = f"<#{self.id}>"
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, embeds=None, view=None, **kwargs):
+        await self.http.request("send")
+        message = FakeMessage(self, content=content or "", embeds=embeds or ([embed] if embed else []), view=view)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.http.request("fetch")
+        return self.messages[message_id]
+
+    def get_partial_message(self, message_id):
+        return self.messages.get(message_id) or FakeMessage(self)
+
+
+class _FakeTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeTextChannel(discord.TextChannel):
+    """ 會通過 isinstance(channel, discord.TextChannel) 的假頻道 (on_message 只處理文字頻道) """
+
+    def __init__(self, guild, name, http, topic=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.http = http
+        self.topic = topic
+        self.category_id = None
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, embeds=None, view=None, **kwargs):
+        return await FakeChannel.send(self, content=content, embed=embed, embeds=embeds, view=view, **kwargs)
+
+    async def fetch_message(self, message_id):
+        return await FakeChannel.fetch_message(self, message_id)
+
+    def get_partial_message(self, message_id):
+        return FakeChannel.get_partial_message(self, message_id)
+
+    def typing(self):
+        return _FakeTyping()
+
+
+class FakeGuild:
+    def __init__(self, http, channel_count=0):
+        self.id = next_id()
+        self.http = http
+        self.default_role = object()
+        self.me = FakeUser("bot", bot=True)
+        self.channels = [FakeChannel(self, f"channel-{i}", http) for i in range(channel_count)]
+        self._by_id = {channel.id: channel for channel in self.channels}
+
+    @property
+    def text_channels(self):
+        return self.channels
+
+    def get_channel(self, channel_id):
+        return self._by_id.get(channel_id)
+
+    _resolve_channel = get_channel  # bot.get_channel() 會對每個伺服器呼叫這個
+
+    def add_text_channel(self, name, topic=None):
+        """ 建一個真的是 discord.TextChannel 的頻道 (壓測 on_message 用) """
+        channel = FakeTextChannel(self, name, self.http, topic=topic)
+        self.channels.append(channel)
+        self._by_id[channel.id] = channel
+        return channel
+
+    async def create_text_channel(self, name, overwrites=None, category=None):
+        await self.http.request("create_channel")
+        channel = FakeChannel(self, name, self.http, category=category)
+        self.channels.append(channel)
+        self._by_id[channel.id] = channel
+        return channel
+
+
+class _FakeResponse:
+    def __init__(self, http):
+        self.http = http
+
+    async def defer(self, **kwargs):
+        await self.http.request("interaction_response")
+
+    async def send_message(self, *args, **kwargs):
+        await self.http.request("interaction_response")
+
+
+class _FakeFollowup:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def send(self, content=None, **kwargs):
+        await self.channel.http.request("followup")
+        return FakeMessage(self.channel, content=content or "")
+
+
+class FakeInteraction:
+    def __init__(self, guild, channel, user, client=None):
+        self.id = next_id()
+        self.client = client
+        self.guild = guild
+        self.channel = channel
+        self.user = user
+        self.response = _FakeResponse(guild.http)
+        self.followup = _FakeFollowup(channel)
@@ -0,0 +1,118 @@
+""" 本機假 Groq 伺服器：給 benchmark 用，模擬 /openai/v1/chat/completions 的延遲與回應 """
+import asyncio
+import json
+import random
+import threading
+import time
+from aiohttp import web
+
+
+class FakeGroqServer:
+    """ 在背景執行緒跑一個 aiohttp 伺服器，回傳固定格式的 chat completion """
+
+    def __init__(self, latency=0.2, responder=None, host="127.0.0.1", port=0, chunk_size=8, chunk_delay=0.02,
+                 char_latency=0.0, rate_limit=0.0, seed=0):
+        self.latency = latency
+        self.rate_limit = rate_limit      # 每個請求被回 429 的機率
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self.char_latency = char_latency  # 非串流回應每多一個字多等多久 (模擬生成時間)
+        self.chunk_size = chunk_size    # 串流模式每一段幾個字
+        self.chunk_delay = chunk_delay  # 串流模式每一段之間隔多久
+        self.responder = responder or (lambda messages: "YES")
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def _chat(self, request):
+        body = await request.json()
+        self.requests += 1
+        if self.rate_limit and self._random.random() < self.rate_limit:
+            self.rate_limited += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                status=429, headers={"retry-after": "1"},
+            )
+        content = self.responder(body["messages"])
+        if body.get("stream"):
+            await asyncio.sleep(self.latency)
+            return await self._stream(request, body, content)
+        await asyncio.sleep(self.latency + self.char_latency * len(content))
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"])
+        return web.json_response({
+            "id": f"fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_tokens + len(content),
+            },
+        })
+
+    async def _stream(self, request, body, content):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        try:
+            for i in range(0, len(content), self.chunk_size):
+                chunk = {
+                    "id": f"fake-{self.requests}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + self.chunk_size]}, "finish_reason": None}],
+                }
+                await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+                await asyncio.sleep(self.chunk_delay)
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except ConnectionResetError:
+            pass  # 客戶端中途不聽了
+        return response
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/openai/v1/chat/completions", self._chat)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
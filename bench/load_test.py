@@ -0,0 +1,389 @@
+""" on_message 壓力測試 / 訊息軌跡重播
+
+用假的 Discord (REST 固定延遲 + 429 注入) 和假的 Groq (另一個行程，延遲 + 429 注入)，
+把一份訊息軌跡 (錄下來的或合成的) 依時間順序丟進正式的 bot：
+  - 一般訊息走 bot.dispatch("message") -> on_message -> 各 cog (接龍 / AI 聊天 / 客服單)
+  - 編輯 / 刪除跟 discord.py 一樣送 raw_message_edit / raw_message_delete (訊息還在快取裡的話再送 message_edit / message_delete)
+  - 開客服單直接按 TicketLauncher 的綠色按鈕
+統計每種模式的吞吐量與 p50 / p95 / p99 延遲、事件迴圈延遲、記憶體尖峰 (tracemalloc)。
+
+延遲怎麼算：
+  - 接龍：訊息送進來到機器人在這則訊息加上 ✅ / ❌
+  - AI 聊天 / 一般頻道 / 編輯 / 刪除：訊息送進來到這個事件觸發的所有 handler 都跑完
+  - 客服單：按下按鈕到開單流程跑完
+
+    python bench/load_test.py --players 500 --game-channels 50 --duration 30 --rate 50
+    python bench/load_test.py --discord-429 0.05 --groq-429 0.1          # 注入限流
+    python bench/load_test.py --save-trace trace.jsonl ...               # 存下合成的軌跡
+    python bench/load_test.py --trace trace.jsonl                        # 重播同一份軌跡
+
+軌跡格式 (JSONL，一行一個事件，依 t 排序)：
+    {"t": 秒, "type": "message" | "edit" | "delete" | "ticket", "channel": "game-0", "user": 3, "content": "...", "ref": 行號}
+  channel 名稱開頭決定頻道種類：game-* 接龍、ai-* AI 聊天、其他是一般頻道；ref 是要編輯 / 刪除的那一行
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import traceback
+import tracemalloc
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_config import BotConfig
+from bot_core import create_bot
+from cogs.tickets import TicketLauncher
+from fake_discord import FakeHTTP, FakeGuild, FakeInteraction, FakeMessage, FakeUser
+from fake_groq import FakeGroqServer
+
+GAME_TOPIC = "【接龍模式】"
+AI_TOPIC = "【AI聊天模式】"
+CHARS = "天地人山水火風雲花草木石日月星海河江湖林森田心手口目耳春夏秋冬東西南北上下大小長高新老"
+CHAT_REPLY = "這是一段假的 AI 回覆，用來模擬串流輸出的長度。" * 6
+SMALL_TALK = ["哈哈哈", "今天好熱", "有人要打球嗎", "晚餐吃什麼", "笑死", "+1"]
+
+
+# ================= 合成軌跡 =================
+def next_word(rng, last_word):
+    """ 接得上詞尾、首尾不同、不會連打三個同字的新詞 """
+    while True:
+        first = last_word[-1] if last_word else rng.choice(CHARS)
+        word = first + "".join(rng.choices(CHARS, k=rng.randint(1, 3)))
+        if word[0] != word[-1] and not any(a == b == c for a, b, c in zip(word, word[1:], word[2:])):
+            return word
+
+
+def synthetic_trace(args):
+    rng = random.Random(args.seed)
+    game = [f"game-{i}" for i in range(args.game_channels)]
+    ai = [f"ai-{i}" for i in range(args.ai_channels)]
+    talk = [f"talk-{i}" for i in range(args.other_channels)]
+    last_word = {}
+    last_player = {}
+    game_lines = []
+    trace = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(args.rate)
+        if t > args.duration:
+            return trace
+        user = rng.randrange(args.players)
+        r = rng.random()
+        if r < args.ticket_share:
+            event = {"type": "ticket", "channel": "lobby", "user": user}
+        elif r < args.ticket_share + args.edit_share and game_lines:
+            ref = rng.choice(game_lines)
+            event = {"type": "edit", "channel": trace[ref]["channel"], "user": trace[ref]["user"], "ref": ref,
+                     "content": next_word(rng, "")}
+        elif r < args.ticket_share + args.edit_share + args.delete_share and game_lines:
+            ref = rng.choice(game_lines)
+            event = {"type": "delete", "channel": trace[ref]["channel"], "user": trace[ref]["user"], "ref": ref}
+        else:
+            r = rng.random()
+            if r < args.ai_share and ai:
+                event = {"type": "message", "channel": rng.choice(ai), "user": user, "content": rng.choice(SMALL_TALK)}
+            elif r < args.ai_share + args.other_share and talk:
+                event = {"type": "message", "channel": rng.choice(talk), "user": user, "content": rng.choice(SMALL_TALK)}
+            else:
+                channel = rng.choice(game)
+                while user == last_player.get(channel):
+                    user = rng.randrange(args.players)
+                word = next_word(rng, last_word.get(channel, ""))
+                last_word[channel], last_player[channel] = word, user
+                game_lines.append(len(trace))
+                event = {"type": "message", "channel": channel, "user": user, "content": word}
+        event["t"] = round(t, 4)
+        trace.append(event)
+
+
+def load_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_trace(trace, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in trace:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+# ================= 假 Groq (另一個行程，不跟 bot 搶 GIL、不算進記憶體) =================
+def respond(messages):
+    system = messages[0]["content"] if messages[0]["role"] == "system" else ""
+    if "verdicts" in system:
+        count = messages[-1]["content"].count("\n") + 1
+        return json.dumps({"verdicts": [{"id": i, "ok": True, "reason": ""} for i in range(1, count + 1)]})
+    if system:
+        return json.dumps({"ok": True, "reason": ""})
+    return CHAT_REPLY
+
+
+def serve_groq(pipe, options):
+    server = FakeGroqServer(responder=respond, **options).start()
+    pipe.send(server.port)
+    pipe.recv()  # 等主行程說結束
+    pipe.send({"requests": server.requests, "rate_limited": server.rate_limited})
+    server.stop()
+
+
+# ================= 重播 =================
+class Record:
+    __slots__ = ("mode", "start", "pending", "done_at", "message")
+
+    def __init__(self, mode, message=None):
+        self.mode = mode
+        self.start = time.perf_counter()
+        self.pending = 0
+        self.done_at = None
+        self.message = message  # 接龍：看這則訊息什麼時候被加上反應
+
+    def task_done(self, _task):
+        self.pending -= 1
+        if self.pending == 0 and self.message is None:
+            self.done_at = time.perf_counter()
+
+    @property
+    def finished_at(self):
+        return self.message.reacted_at if self.message is not None else self.done_at
+
+
+class EventTracker:
+    """ 記下每個事件觸發了哪些 handler task (包含 on_message 再分派出去的 on_game_message / on_ai_message) """
+
+    def __init__(self, bot):
+        self.records = {}  # id(事件的第一個參數) -> Record
+        self.errors = 0
+        schedule = bot._schedule_event
+
+        def tracked(coro, event_name, *args, **kwargs):
+            task = schedule(coro, event_name, *args, **kwargs)
+            record = self.records.get(id(args[0])) if args else None
+            if record is not None:
+                record.pending += 1
+                task.add_done_callback(record.task_done)
+            return task
+
+        async def on_error(event_name, *args, **kwargs):
+            self.errors += 1
+            if self.errors <= 3:
+                traceback.print_exc()
+
+        bot._schedule_event = tracked
+        bot.on_error = on_error
+
+    def track(self, key, record):
+        self.records[id(key)] = record
+        return record
+
+
+async def sample_loop_lag(stop, samples, interval=0.05):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+def channel_mode(name):
+    return "game" if name.startswith("game-") else "ai" if name.startswith("ai-") else "other"
+
+
+async def replay(bot, trace, args):
+    http = FakeHTTP(latency=args.discord_latency, rate_limit=args.discord_429, retry_after=args.retry_after,
+                    seed=args.seed)
+    guild = FakeGuild(http)
+    channels = {}
+    for name in sorted({event["channel"] for event in trace}):
+        topic = {"game": GAME_TOPIC, "ai": AI_TOPIC}.get(channel_mode(name))
+        channels[name] = guild.add_text_channel(name, topic=None if name == "lobby" else topic)
+    bot.topic_index.build([guild])
+    bot._connection.user = guild.me  # 沒有真的登入，補上 READY 時才會有的機器人帳號 (process_commands 要用)
+    bot._connection._add_guild(guild)  # bot.get_channel() 找得到假頻道
+    if args.ai_cache_ttl:
+        for name, channel in channels.items():
+            if channel_mode(name) == "ai":
+                bot.get_channel_config(channel.id)["ai_cache_ttl"] = args.ai_cache_ttl
+    users = {}
+    messages = {}
+    records = []
+    tickets = set()
+    tracker = EventTracker(bot)
+
+    def user(user_id):
+        if user_id not in users:
+            users[user_id] = FakeUser(f"player{user_id}")
+        return users[user_id]
+
+    async def open_ticket(record, interaction):
+        try:
+            await TicketLauncher().create_ticket_button.callback(interaction)
+        finally:
+            record.done_at = time.perf_counter()
+
+    start = time.perf_counter()
+    for line, event in enumerate(trace):
+        delay = start + event["t"] / args.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        channel = channels[event["channel"]]
+        kind = event["type"]
+        if kind == "message":
+            message = FakeMessage(channel, author=user(event["user"]), content=event["content"])
+            channel.messages[message.id] = message
+            messages[line] = message
+            mode = channel_mode(event["channel"])
+            record = tracker.track(message, Record(mode, message if mode == "game" else None))
+            bot.dispatch("message", message)
+        elif kind == "edit":
+            before = messages.get(event["ref"])
+            if before is None:
+                continue
+            after = FakeMessage(channel, author=before.author, content=event["content"])
+            after.id, after.reactions = before.id, before.reactions
+            payload = discord.RawMessageUpdateEvent({"id": str(before.id), "channel_id": str(channel.id)}, after)
+            payload.cached_message = before
+            record = tracker.track(payload, Record("edit"))
+            tracker.track(before, record)
+            bot.dispatch("raw_message_edit", payload)
+            bot.dispatch("message_edit", before, after)
+            before.content = after.content
+        elif kind == "delete":
+            message = messages.pop(event["ref"], None)
+            if message is None:
+                continue
+            channel.messages.pop(message.id, None)
+            payload = discord.RawMessageDeleteEvent(
+                {"id": str(message.id), "channel_id": str(channel.id), "guild_id": str(guild.id)})
+            payload.cached_message = message
+            record = tracker.track(payload, Record("delete"))
+            tracker.track(message, record)
+            bot.dispatch("raw_message_delete", payload)
+            bot.dispatch("message_delete", message)
+        elif kind == "ticket":
+            interaction = FakeInteraction(guild, channel, user(event["user"]), client=bot)
+            record = Record("ticket")
+            task = asyncio.create_task(open_ticket(record, interaction))
+            tickets.add(task)
+            task.add_done_callback(tickets.discard)
+        else:
+            raise ValueError(f"未知的事件類型：{kind}")
+        records.append(record)
+    dispatched = time.perf_counter() - start
+
+    # 等所有事件處理完 (接龍要等到加上反應)，最多等 drain 秒
+    deadline = time.perf_counter() + args.drain
+    while time.perf_counter() < deadline and any(r.finished_at is None for r in records):
+        await asyncio.sleep(0.05)
+    return records, http, tracker, start, dispatched
+
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1] if len(values) > 1 else values[0]
+
+
+async def main(args):
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args)
+    if args.save_trace:
+        save_trace(trace, args.save_trace)
+        print(f"💾 軌跡已存到 {args.save_trace}")
+
+    pipe, child_pipe = multiprocessing.Pipe()
+    groq = multiprocessing.Process(target=serve_groq, args=(child_pipe, {
+        "latency": args.groq_latency, "char_latency": args.groq_char_latency,
+        "rate_limit": args.groq_429, "seed": args.seed,
+    }))
+    groq.start()
+    port = pipe.recv()
+
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    bot = create_bot(BotConfig(db_path=":memory:", health_port=None, cogs=("game", "ai_chat", "tickets"),
+                               lexicon_path="", groq_api_key="fake", groq_base_url=f"http://127.0.0.1:{port}"))
+    lag = []
+    stop = asyncio.Event()
+    try:
+        async with bot:  # 不登入 Discord，只跑 setup_hook 載入 cog
+            await bot.setup_hook()
+            sampler = asyncio.create_task(sample_loop_lag(stop, lag))
+            records, http, tracker, start, dispatched = await replay(bot, trace, args)
+            stop.set()
+            await sampler
+            peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            router = bot.__dict__.get("router")
+            response_cache = bot.__dict__.get("response_cache")
+            overload = bot.__dict__.get("overload")
+    finally:
+        tracemalloc.stop()
+        pipe.send("stop")
+        groq_stats = pipe.recv()
+        groq.join()
+
+    finished = [r for r in records if r.finished_at is not None]
+    elapsed = max((r.finished_at for r in finished), default=start) - start
+    print(f"{len(trace)} 個事件 / {trace[-1]['t'] if trace else 0:.0f} 秒 (重播速度 x{args.speed:g})，"
+          f"送完花 {dispatched:.1f} 秒，全部處理完 {elapsed:.1f} 秒")
+    print(f"Discord REST 延遲 {args.discord_latency * 1000:.0f} ms / 429 機率 {args.discord_429:.0%}，"
+          f"Groq 延遲 {args.groq_latency * 1000:.0f} ms / 429 機率 {args.groq_429:.0%}")
+    print(f"{'模式':<7} | {'事件':>6} | {'完成':>6} | {'每秒':>7} | {'p50':>9} | {'p95':>9} | {'p99':>9}")
+    for mode in ("game", "ai", "other", "edit", "delete", "ticket"):
+        group = [r for r in records if r.mode == mode]
+        done = [r.finished_at - r.start for r in group if r.finished_at is not None]
+        if not group:
+            continue
+        if not done:
+            print(f"{mode:<9} | {len(group):>8} | {0:>8} |")
+            continue
+        print(f"{mode:<9} | {len(group):>8} | {len(done):>8} | {len(done) / elapsed:>9.1f} | "
+              f"{percentile(done, 50) * 1000:>6.0f} ms | {percentile(done, 95) * 1000:>6.0f} ms | "
+              f"{percentile(done, 99) * 1000:>6.0f} ms")
+    print(f"總吞吐量：{len(finished) / elapsed:.1f} 事件/秒，handler 例外 {tracker.errors} 次")
+    if lag:
+        print(f"事件迴圈延遲：p50 {percentile(lag, 50) * 1000:.1f} ms，p99 {percentile(lag, 99) * 1000:.1f} ms，"
+              f"最大 {max(lag) * 1000:.1f} ms")
+    if peak is not None:
+        print(f"記憶體尖峰 (tracemalloc)：{peak / 1024 / 1024:.1f} MiB")
+    print(f"Discord REST：{http.total} 次，被 429 {sum(http.rate_limited.values())} 次；"
+          f"Groq：{groq_stats['requests']} 次，被 429 {groq_stats['rate_limited']} 次"
+          + (f"，換備用模型 {router.fallbacks} 次" if router else ""))
+    if response_cache is not None:
+        print(f"AI 回覆快取：命中率 {response_cache.hit_rate:.1%}，省下 {response_cache.tokens_saved} tokens")
+    if overload is not None:
+        print(f"過載保護：斷路器 {overload.state}，擋下 {overload.total.shed} 件，"
+              f"發出忙線通知 {len(overload._notices)} 個頻道")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", help="重播這份軌跡 (不給就合成)")
+    parser.add_argument("--save-trace", help="把這次用的軌跡存下來")
+    parser.add_argument("--speed", type=float, default=1.0, help="重播速度倍率")
+    parser.add_argument("--drain", type=float, default=60, help="送完之後最多等幾秒讓事件處理完")
+    parser.add_argument("--seed", type=int, default=1)
+    # 合成軌跡
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--game-channels", type=int, default=50)
+    parser.add_argument("--ai-channels", type=int, default=5)
+    parser.add_argument("--other-channels", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="軌跡長度 (秒)")
+    parser.add_argument("--rate", type=float, default=50, help="平均每秒幾個事件")
+    parser.add_argument("--ai-share", type=float, default=0.05)
+    parser.add_argument("--other-share", type=float, default=0.2)
+    parser.add_argument("--edit-share", type=float, default=0.02)
+    parser.add_argument("--delete-share", type=float, default=0.01)
+    parser.add_argument("--ticket-share", type=float, default=0.005)
+    # 假服務
+    parser.add_argument("--discord-latency", type=float, default=0.08)
+    parser.add_argument("--discord-429", type=float, default=0.0, help="每次 REST 呼叫被 429 的機率")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--groq-latency", type=float, default=0.2)
+    parser.add_argument("--groq-char-latency", type=float, default=0.0005)
+    parser.add_argument("--groq-429", type=float, default=0.0, help="每個 Groq 請求被 429 的機率")
+    parser.add_argument("--ai-cache-ttl", type=float, default=0, help="AI 頻道開啟回應快取 (秒，0 = 不開)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="不量記憶體 (tracemalloc 會拖慢)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+import os
+import storage
+from model_router import routes_from_env
+
+# ================= 設定 =================
+# 所有設定都集中在這裡，預設值從環境變數讀；
+# 壓測 / 測試可以直接 BotConfig(db_path=":memory:", health_port=None, cogs=["game"]) 覆寫
+
+ALL_COGS = ("game", "ai_chat", "tickets", "story", "admin")
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default) == "1"
+
+
+def _env_ids(name):
+    value = os.environ.get(name)
+    return [int(part) for part in value.split(",") if part.strip()] if value else None
+
+
+class BotConfig:
+    """ 機器人設定；BotConfig(**overrides) 先讀環境變數，再用參數覆寫 """
+
+    def __init__(self, **overrides):
+        self.discord_token = os.environ.get("DISCORD_TOKEN")
+        self.groq_api_key = os.environ.get("GROQ_API_KEY")
+        self.command_prefix = "!"
+        self.cogs = ALL_COGS                                       # 要載入哪些功能
+
+        # 資料庫 / 健康檢查
+        self.db_path = os.environ.get("BOT_DB_PATH")               # None = BOT_DATA_DIR/bot.db
+        self.health_port = _env_int("PORT", "8080")                # None = 不開健康檢查伺服器 (Render 會給 PORT)
+
+        # 分片：都不設就由 Discord 建議 shard 數，全部在這個行程跑；
+        # 多行程時每個行程設同樣的 SHARD_COUNT、不同的 SHARD_IDS (例如 "0,1" / "2,3")，
+        # 共用同一個 BOT_DB_PATH，PORT 要各自不同
+        self.shard_count = int(os.environ["SHARD_COUNT"]) if os.environ.get("SHARD_COUNT") else None
+        self.shard_ids = _env_ids("SHARD_IDS")
+
+        # LLM
+        self.llm_max_in_flight = _env_int("LLM_MAX_IN_FLIGHT", "8")  # 同時進行中的 LLM 請求上限
+        self.llm_timeout = _env_float("LLM_TIMEOUT", "30")           # 單次 LLM 呼叫逾時 (秒)
+        self.groq_base_url = os.environ.get("GROQ_BASE_URL")         # 壓測時指向假的 Groq 伺服器
+        self.llm_max_retries = _env_int("LLM_MAX_RETRIES", "0")      # SDK 自己的重試；預設 0，429 直接交給路由換備用模型
+        self.model_routes = routes_from_env()                        # 每種任務用哪個模型 (見 model_router.py)
+        # 過載保護 (見 overload.py)
+        self.overload_capacity = _env_int("OVERLOAD_CAPACITY", "64")              # 同時進行中的 LLM 工作多少算滿 (含排隊等 LLM_MAX_IN_FLIGHT 的、串流回覆中的)
+        self.overload_guild_share = _env_float("OVERLOAD_GUILD_SHARE", "0.5")     # 單一伺服器最多佔容量的幾成
+        self.overload_error_threshold = _env_float("OVERLOAD_ERROR_THRESHOLD", "0.5")  # 錯誤率到這裡就算滿、斷路器打開
+        self.breaker_failures = _env_int("BREAKER_FAILURES", "5")                 # 連續失敗幾次斷路器打開
+        self.breaker_min_samples = _env_int("BREAKER_MIN_SAMPLES", "10")          # 至少累積幾個結果才用錯誤率開斷路器
+        self.breaker_cooldown = _env_float("BREAKER_COOLDOWN", "30")              # 斷路器打開多久再試 (秒，連續失敗會加倍)
+        self.overload_notice_interval = _env_float("OVERLOAD_NOTICE_INTERVAL", "60")  # 同一頻道「忙線中」通知的最短間隔 (秒)
+
+        # 接龍
+        self.verdict_cache_size = _env_int("VERDICT_CACHE_SIZE", "50000")
+        self.verdict_cache_ttl_days = _env_float("VERDICT_CACHE_TTL_DAYS", "30")
+        self.lexicon_path = os.environ.get("LEXICON_PATH", os.path.join(storage.DATA_DIR, "lexicon.txt"))
+        self.game_queue_depth = _env_int("GAME_QUEUE_DEPTH", "50")   # 每個頻道的排隊上限 (超過就直接 ❌)
+        self.judge_batch_window = _env_float("JUDGE_BATCH_WINDOW", "0.005")  # LLM 塞住的時候，各頻道的候選詞收集多久再一起送 (秒，0 = 永遠一詞一次)
+        self.judge_batch_size = _env_int("JUDGE_BATCH_SIZE", "8")           # 一批最多幾個詞 (湊滿就立刻送)
+        self.accepted_index_size = _env_int("ACCEPTED_INDEX_SIZE", "500")   # 每個頻道記住最近幾個通過的詞 (抓包編輯 / 刪除用)
+
+        # AI 聊天
+        self.ai_streaming = _env_flag("AI_STREAMING", "1")                      # 是否用串流回覆
+        self.ai_stream_edit_interval = _env_float("AI_STREAM_EDIT_INTERVAL", "1.0")  # 串流時多久編輯一次訊息 (秒)
+        self.ai_memory_tokens = _env_int("AI_MEMORY_TOKENS", "1500")
+        self.ai_memory_turns = _env_int("AI_MEMORY_TURNS", "10")
+        self.ai_memory_channels = _env_int("AI_MEMORY_CHANNELS", "1000")
+        self.ai_memory_idle = _env_float("AI_MEMORY_IDLE", "3600")
+        self.ai_memory_summary = _env_flag("AI_MEMORY_SUMMARY", "1")            # 被擠掉的舊對話要不要濃縮成摘要
+        self.ai_cache_entries = _env_int("AI_CACHE_ENTRIES", "1000")           # 回應快取最多幾筆 (用 !aicache 開啟的頻道共用)
+        self.ai_cache_max_ttl = _env_float("AI_CACHE_MAX_TTL", "86400")        # 回應快取每筆最多留幾秒
+
+        # 對外 Discord 動作排程
+        self.outbound_workers = _env_int("OUTBOUND_WORKERS", "4")
+
+        # 每日故事
+        self.story_workers = _env_int("STORY_WORKERS", "4")                # 同時處理幾個接龍頻道
+        self.story_chunk_tokens = _env_int("STORY_CHUNK_TOKENS", "1500")   # 詞彙超過這個 token 數就分批生成
+        self.story_stitch_tokens = _env_int("STORY_STITCH_TOKENS", "6000") # 最後串接時所有片段加起來的上限
+        self.story_lease_seconds = _env_float("STORY_LEASE_SECONDS", "300")  # 多行程時一個頻道的租約多久沒續約就算那個行程掛了，別人可以接手
+
+        for key, value in overrides.items():
+            if not hasattr(self, key):
+                raise TypeError(f"未知的設定：{key}")
+            setattr(self, key, value)
@@ -0,0 +1,238 @@
+import asyncio
+import atexit
+import math
+import signal
+from functools import cached_property
+
+import discord
+from discord.ext import commands
+
+import metrics
+import storage
+from bot_config import BotConfig
+from keep_alive import HealthServer
+from shared_state import SQLiteSharedState, default_owner
+from topic_index import TopicIndex, GAME, AI, STORY_OUTPUT
+
+# ================= 機器人本體 =================
+# import 這個模組不會連線、不會開伺服器，也不會建立 Groq client：
+#   - create_bot(config) 回傳一個還沒登入的 bot，功能 (cog) 在 setup_hook 裡依 config.cogs 載入
+#   - 共用的元件 (LLM、資料庫、快取...) 都是第一次用到才建立
+#   - on_message 只負責找出頻道模式，再發 "{模式}_message" 事件給對應的 cog
+#   - 用 AutoShardedBot，可以一個行程跑全部 shard，也可以多個行程各跑幾個 (見 bot_config)，
+#     跨行程的資料都透過 shared_state 存取
+# 所以壓測 / 測試可以只載入一個 cog，搭配假的 Discord / Groq 單獨跑某條熱路徑
+
+
+class DiscordBot(commands.AutoShardedBot):
+    def __init__(self, config):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        super().__init__(command_prefix=config.command_prefix, intents=intents,
+                         shard_count=config.shard_count, shard_ids=config.shard_ids)
+        self.config = config
+        # 這個行程負責哪些 shard ("" = 全部)；每日故事依這個分開記錄進度
+        self.scope = ",".join(map(str, config.shard_ids)) if config.shard_ids else ""
+        self.instance_id = default_owner(self.scope)
+        self.topic_index = TopicIndex()  # 頻道用途索引 (依 channel.topic)，上線時建一次，之後靠頻道事件維護
+        self.loop_lag = metrics.LoopLagSampler()
+        self.health_server = None
+        if config.health_port is not None:
+            self.health_server = HealthServer(health=self.gateway_health, port=config.health_port)
+        metrics.instrument_http(self.http)  # 每個 Discord REST 呼叫都記錄耗時
+
+    # --- 共用元件 (第一次用到才建立) ---
+    @cached_property
+    def shared_state(self):
+        # 所有 shard 行程共用同一個 SQLite 檔 (頻道設定、裁判快取、故事進度、租約鎖)
+        return SQLiteSharedState(self.config.db_path)
+
+    def connect_db(self):
+        return self.shared_state.connect()
+
+    @cached_property
+    def llm(self):
+        # Groq SDK 載入要一段時間，等真的要呼叫 LLM 時才 import
+        from llm_gateway import LLMGateway
+        gateway = LLMGateway(api_key=self.config.groq_api_key, max_in_flight=self.config.llm_max_in_flight,
+                             timeout=self.config.llm_timeout, base_url=self.config.groq_base_url,
+                             max_retries=self.config.llm_max_retries)
+        metrics.LLM_IN_FLIGHT.track(lambda: gateway.in_flight)
+        return gateway
+
+    @cached_property
+    def router(self):
+        # 依任務選模型 (小模型先上、不合格升級、逾時 / 429 換備用)，所有 cog 都透過這裡呼叫 LLM
+        from model_router import ModelRouter
+        return ModelRouter(self.llm, self.config.model_routes)
+
+    @cached_property
+    def overload(self):
+        # LLM 過載保護 (追蹤負載、依優先順序擋下工作、斷路器、通知節流)，各 cog 呼叫 LLM 前都要先過這關
+        from overload import OverloadController, OPEN, HALF_OPEN
+        controller = OverloadController(capacity=self.config.overload_capacity,
+                                        guild_share=self.config.overload_guild_share,
+                                        error_threshold=self.config.overload_error_threshold,
+                                        min_samples=self.config.breaker_min_samples,
+                                        breaker_failures=self.config.breaker_failures,
+                                        breaker_cooldown=self.config.breaker_cooldown,
+                                        notice_interval=self.config.overload_notice_interval)
+        metrics.LLM_LOAD.track(controller.load)
+        metrics.LLM_BREAKER_OPEN.track(lambda: 1 if controller.state in (OPEN, HALF_OPEN) else 0)
+        return controller
+
+    @cached_property
+    def channel_store(self):
+        # 頻道設定存在 SQLite (一次載入，修改後背景批次寫回)，重啟不會遺失進度
+        from channel_store import ChannelStore
+        store = ChannelStore(self.connect_db())
+        store.load()
+        atexit.register(store.flush)
+        return store
+
+    @cached_property
+    def word_log(self):
+        # 通過的接龍詞彙 (含編輯/刪除紀錄)，每日故事直接從這裡撈
+        from word_log import WordLog
+        return WordLog(self.connect_db())
+
+    @cached_property
+    def ticket_registry(self):
+        # 客服單登記簿：(伺服器, 使用者) -> 客服單頻道
+        from ticket_registry import TicketRegistry
+        registry = TicketRegistry(self.connect_db())
+        for channel_id, owner_id, message_id in self.channel_store.legacy_temp_buttons():
+            registry.set_temp_button(channel_id, owner_id, message_id, layout=None)  # 舊版記在頻道設定裡的紅色按鈕
+        return registry
+
+    @cached_property
+    def chat_memory(self):
+        # AI 聊天模式的對話記憶 (每個頻道最近幾輪，有 token 上限，閒置頻道自動淘汰)
+        from chat_memory import ConversationMemory
+        memory = ConversationMemory(token_budget=self.config.ai_memory_tokens, max_turns=self.config.ai_memory_turns,
+                                    max_channels=self.config.ai_memory_channels, idle_ttl=self.config.ai_memory_idle)
+        metrics.CHAT_MEMORY_CHANNELS.track(lambda: len(memory))
+        return memory
+
+    @cached_property
+    def response_cache(self):
+        # AI 聊天回應快取 (跨頻道 / 跨伺服器共用，只有用 !aicache 開啟的頻道會用到)
+        from response_cache import ResponseCache
+        cache = ResponseCache(max_entries=self.config.ai_cache_entries, max_ttl=self.config.ai_cache_max_ttl)
+        metrics.AI_CACHE_HIT_RATIO.track(lambda: cache.hit_rate)
+        metrics.AI_CACHE_TOKENS_SAVED.track(lambda: cache.tokens_saved)
+        return cache
+
+    @cached_property
+    def outbound(self):
+        # 對外 Discord 動作排程 (依路由限流、依優先順序送、合併罵人訊息)
+        from outbound import OutboundScheduler
+        return OutboundScheduler(workers=self.config.outbound_workers)
+
+    def get_channel_config(self, channel_id):
+        return self.channel_store.get(channel_id)
+
+    # --- 生命週期 ---
+    async def setup_hook(self):
+        # 健康檢查伺服器跟機器人共用同一個事件迴圈
+        if self.health_server is not None:
+            await self.health_server.start()
+        # bot.run 只處理 Ctrl+C；SIGTERM (容器 / systemd 停止) 也要走 close()，頻道設定和排隊中的寫入才會寫回
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows / 不在主執行緒：只能靠 atexit
+        for name in self.config.cogs:
+            await self.load_extension(f"cogs.{name}")
+
+    async def close(self):
+        if self.health_server is not None:
+            await self.health_server.stop()
+        self.loop_lag.stop()
+        if "llm" in self.__dict__:
+            self.llm.close()
+        if "channel_store" in self.__dict__:
+            # 被 SIGTERM 之類的訊號關掉時 atexit 不一定會跑，關機流程自己把頻道設定寫回去
+            await asyncio.to_thread(self.channel_store.flush)
+        await asyncio.to_thread(storage.flush_writers)  # 還在排隊的資料庫寫入 (接龍紀錄、客服單、裁判快取...) 寫完
+        await super().close()
+
+    def gateway_health(self):
+        """ 給 /healthz 用：Gateway 有沒有連著 """
+        connected = self.is_ready() and not self.is_closed()
+        shards = {
+            str(shard_id): {
+                "connected": not shard.is_closed(),
+                "latency": shard.latency if math.isfinite(shard.latency) else None,
+            }
+            for shard_id, shard in self.shards.items()
+        }
+        return connected, {
+            "gateway": "connected" if connected else "disconnected",
+            "shards": shards,
+            "shard_count": self.shard_count,
+            "guilds": len(self.guilds),
+        }
+
+    async def on_ready(self):
+        # 頻道索引要在各 cog 的 on_ready 之前建好 (這段沒有 await，會先跑完)
+        self.topic_index.build(self.guilds)
+        print(f'機器人 {self.user} 已上線！')
+        self.loop_lag.start()
+        self.channel_store.start()
+        await self.change_presence(activity=discord.Game(name="等待指令..."))
+
+    # === [維護頻道主題索引] ===
+    async def on_guild_channel_create(self, channel):
+        self.topic_index.update(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        self.topic_index.update(after)
+
+    async def on_guild_channel_delete(self, channel):
+        self.topic_index.remove(channel)
+
+    async def on_guild_join(self, guild):
+        self.topic_index.add_guild(guild)
+
+    async def on_guild_remove(self, guild):
+        self.topic_index.remove_guild(guild)
+
+    # === [訊息分派] ===
+    def resolve_config(self, message):
+        """ 找出訊息所在頻道的設定；不用處理的頻道回傳 None (不替它建立設定) """
+        if not isinstance(message.channel, discord.TextChannel):
+            return None
+        role = self.topic_index.role_of(message.channel.id)
+        if role == STORY_OUTPUT:
+            return None
+        if role == GAME:
+            config = self.get_channel_config(message.channel.id)
+            if config["mode"] != "game":
+                config["mode"] = "game"
+        elif role == AI:
+            config = self.get_channel_config(message.channel.id)
+            if config["mode"] != "ai":
+                config["mode"] = "ai"
+        else:
+            # 一般頻道：沒用選單設定過就直接結束
+            config = self.channel_store.peek(message.channel.id)
+        return config
+
+    async def on_message(self, message):
+        if message.author == self.user: return
+
+        await self.process_commands(message)
+
+        if message.content.startswith(self.config.command_prefix): return
+
+        config = self.resolve_config(message)
+        if config is None or config["mode"] == "idle":
+            return
+        # 交給對應的 cog：on_game_message / on_ai_message (沒載入就沒人處理)
+        self.dispatch(f"{config['mode']}_message", message, config)
+
+
+def create_bot(config=None):
+    """ 建立一個還沒登入的 bot；功能在 setup_hook (login 時) 依 config.cogs 載入 """
+    return DiscordBot(config or BotConfig())
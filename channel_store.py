@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+# ================= 頻道設定儲存 =================
+# 取代原本只活在記憶體裡的 channel_data：
+#   - 啟動時一次 SELECT 把所有頻道設定載回來，不用再翻歷史訊息找進度
+#   - config["xxx"] = ... 照舊直接改 dict，改過的頻道會被標記起來，
+#     背景每隔 flush_interval 秒合併成一個 transaction 寫回 SQLite
+
+DEFAULT_CONFIG = {
+    "mode": "idle", # 預設掛機
+    "game_last_word": "",
+    "last_player_id": None,
+    "ai_cache_ttl": 0,  # AI 聊天回應快取：接受幾秒內的快取回應 (0 = 不用快取)
+}
+FIELDS = tuple(DEFAULT_CONFIG)
+
+
+class ChannelConfig(dict):
+    """ 一般 dict，但被修改時會通知 store 這個頻道需要寫回 """
+
+    def __init__(self, store, channel_id, values):
+        super().__init__(values)
+        self._store = store
+        self.channel_id = channel_id
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._store.mark_dirty(self.channel_id)
+
+
+class ChannelStore:
+    def __init__(self, conn, flush_interval=1.0):
+        self.conn = conn
+        self.flush_interval = flush_interval
+        self._configs = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._flush_task = None
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS channel_config (
+                channel_id INTEGER PRIMARY KEY,
+                mode TEXT NOT NULL,
+                game_last_word TEXT NOT NULL,
+                last_player_id INTEGER,
+                temp_msg_id INTEGER,    -- 舊版欄位，客服單紅色按鈕已改由 TicketRegistry 記錄
+                ticket_owner_id INTEGER,
+                updated_at REAL NOT NULL
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(channel_config)")}
+        if "ai_cache_ttl" not in columns:
+            conn.execute("ALTER TABLE channel_config ADD COLUMN ai_cache_ttl REAL NOT NULL DEFAULT 0")
+
+    def load(self):
+        """ 一次把所有頻道設定讀進記憶體，回傳載入的筆數 """
+        rows = self.conn.execute(f"SELECT channel_id, {', '.join(FIELDS)} FROM channel_config").fetchall()
+        for channel_id, *values in rows:
+            self._configs[channel_id] = ChannelConfig(self, channel_id, zip(FIELDS, values))
+        return len(rows)
+
+    def legacy_temp_buttons(self):
+        """ 取出舊版記在頻道設定裡的客服單紅色按鈕 [(channel_id, owner_id, message_id)]，取出後清空 """
+        rows = self.conn.execute(
+            "SELECT channel_id, ticket_owner_id, temp_msg_id FROM channel_config "
+            "WHERE temp_msg_id IS NOT NULL AND ticket_owner_id IS NOT NULL"
+        ).fetchall()
+        if rows:
+            self.conn.execute("UPDATE channel_config SET temp_msg_id = NULL, ticket_owner_id = NULL")
+        return rows
+
+    def peek(self, channel_id):
+        """ 只查不建：沒設定過的頻道回傳 None，不會在記憶體裡多留一筆 """
+        return self._configs.get(channel_id)
+
+    def get(self, channel_id):
+        config = self._configs.get(channel_id)
+        if config is None:
+            config = self._configs[channel_id] = ChannelConfig(self, channel_id, DEFAULT_CONFIG)
+        return config
+
+    def items(self):
+        return self._configs.items()
+
+    def mark_dirty(self, channel_id):
+        self._dirty.add(channel_id)
+
+    def _take_dirty_rows(self):
+        """ 在事件迴圈上拍一張快照，之後的寫入就不會跟 config 修改搶資料 """
+        dirty, self._dirty = self._dirty, set()
+        now = time.time()
+        return [
+            (channel_id, *(self._configs[channel_id][f] for f in FIELDS), now)
+            for channel_id in dirty if channel_id in self._configs
+        ]
+
+    def _write(self, rows):
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" * (len(FIELDS) + 2))
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")  # 一開始就拿寫入鎖，跟其他 shard 行程撞到時照 busy_timeout 等
+            try:
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO channel_config (channel_id, {', '.join(FIELDS)}, updated_at) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                self._dirty.update(row[0] for row in rows)
+                raise
+        return len(rows)
+
+    def flush(self):
+        """ 立刻把所有改過的頻道寫回資料庫 (關機時用) """
+        return self._write(self._take_dirty_rows())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self._write, self._take_dirty_rows())
+            except Exception as e:
+                print(f"⚠️ 頻道設定寫入失敗，稍後重試：{e}")
+
+    def start(self):
+        """ 啟動背景批次寫入 (重複呼叫不會開第二個) """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict, deque
+
+from story_chunking import estimate_tokens
+
+# ================= AI 聊天記憶 =================
+# 每個 AI 頻道記住最近幾輪對話 (deque 當 ring buffer，舊的從前面丟掉)，總長度受 token 預算限制；
+# 超出預算被擠掉的舊對話可以交給 LLM 濃縮成一段摘要，放在 system 訊息裡，
+# 所以不管聊多久，送出去的 prompt 大小都有上限。
+# 頻道本身也有上限 + 閒置淘汰 (LRU)，幾千個頻道記憶體也不會一直長。
+
+
+class ChannelHistory:
+    __slots__ = ("turns", "tokens", "summary", "last_used")
+
+    def __init__(self):
+        self.turns = deque()  # 每一輪 (使用者, AI 回覆, tokens)
+        self.tokens = 0
+        self.summary = ""
+        self.last_used = time.monotonic()
+
+
+class ConversationMemory:
+    def __init__(self, token_budget=1500, max_turns=20, max_channels=1000, idle_ttl=3600):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.max_channels = max_channels
+        self.idle_ttl = idle_ttl
+        self._channels = OrderedDict()  # channel_id -> ChannelHistory，越後面越近期用過
+
+    def _get(self, channel_id):
+        self._evict_idle()
+        history = self._channels.get(channel_id)
+        if history is None:
+            history = self._channels[channel_id] = ChannelHistory()
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+        else:
+            self._channels.move_to_end(channel_id)
+        history.last_used = time.monotonic()
+        return history
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._channels:
+            oldest = next(iter(self._channels.values()))
+            if oldest.last_used >= cutoff:
+                break
+            self._channels.popitem(last=False)
+
+    def build_messages(self, channel_id, user_content, system_prompt=None):
+        """ 組出要送給 LLM 的 messages：system (含摘要) + 歷史對話 + 這次的問題 """
+        history = self._get(channel_id)
+        messages = []
+        system = system_prompt or ""
+        if history.summary:
+            system = f"{system}\n先前對話摘要：{history.summary}".strip()
+        if system:
+            messages.append({"role": "system", "content": system})
+        for user_turn, assistant_turn, _ in history.turns:
+            messages.append({"role": "user", "content": user_turn})
+            messages.append({"role": "assistant", "content": assistant_turn})
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+    def record(self, channel_id, user_content, assistant_content):
+        """ 記下一輪對話，回傳因為超出輪數或 token 預算被擠掉的舊對話 [(使用者, AI 回覆)] """
+        history = self._get(channel_id)
+        tokens = estimate_tokens(user_content) + estimate_tokens(assistant_content)
+        history.turns.append((user_content, assistant_content, tokens))
+        history.tokens += tokens
+
+        # 超過輪數或 token 預算就從最舊的開始丟 (至少保留最新這一輪)
+        dropped = []
+        while len(history.turns) > 1 and (len(history.turns) > self.max_turns or history.tokens > self.token_budget):
+            old_user, old_assistant, old_tokens = history.turns.popleft()
+            history.tokens -= old_tokens
+            dropped.append((old_user, old_assistant))
+        return dropped
+
+    def summary(self, channel_id):
+        history = self._channels.get(channel_id)
+        return history.summary if history else ""
+
+    def set_summary(self, channel_id, summary):
+        history = self._channels.get(channel_id)
+        if history is not None:
+            history.summary = summary
+
+    def forget(self, channel_id):
+        self._channels.pop(channel_id, None)
+
+    def __len__(self):
+        return len(self._channels)
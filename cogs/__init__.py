@@ -0,0 +1,8 @@
+# ================= 功能模組 (cog) =================
+# 每個檔案是一個可以單獨載入的 discord.py extension (各自有 setup(bot))：
+#   game     接龍遊戲 (裁判、頻道佇列、抓包刪改留言)
+#   ai_chat  AI 聊天 (串流回覆、對話記憶)
+#   tickets  客服單 (開單面板、臨時按鈕)
+#   story    每日故事 (排程、分批生成、接續未完成的一輪)
+#   admin    管理員選單與統計指令
+# 共用的元件 (LLM、頻道設定、對外排程...) 都掛在 bot 上，見 bot_core.DiscordBot
@@ -0,0 +1,250 @@
+import discord
+from discord.ext import commands
+
+import metrics
+import model_router
+from cogs.tickets import TicketLauncher
+from overload import Overloaded
+from topic_index import GAME, STORY_TEST, STORY_TOPIC
+
+
+# ================= 2. 模式切換選單 =================
+class ModeSelectView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.select(
+        placeholder="請選擇功能...",
+        options=[
+            discord.SelectOption(label="🔴 關閉功能 (掛機)", value="idle", description="停止回應", emoji="💤"),
+            discord.SelectOption(label="📢 發送客服面板", value="setup_panel", description="在該頻道產生按鈕", emoji="🎫"),
+            discord.SelectOption(label="📜 設定此頻道為故事館", value="set_story_channel", description="將該頻道設定為每日故事發布區", emoji="📖"),
+            discord.SelectOption(label="🧪 測試故事功能 (抓最新10詞)", value="test_story", description="搜尋最新接龍紀錄", emoji="🧬"),
+            discord.SelectOption(label="🎮 接龍遊戲", value="game", description="開啟接龍模式", emoji="🎮"),
+            discord.SelectOption(label="🤖 AI 聊天", value="ai", description="開啟 AI 對話", emoji="🤖"),
+        ]
+    )
+    async def select_callback(self, interaction, select):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ 只有管理員可以使用此選單！", ephemeral=True)
+            return
+
+        bot = interaction.client
+        new_mode = select.values[0]
+        channel = interaction.channel
+        cid = channel.id
+        config = bot.get_channel_config(cid)
+
+        # 預設模式重置
+        config["mode"] = "idle"
+        bot.chat_memory.forget(cid)
+
+        # --- 測試故事功能 ---
+        if new_mode == "test_story":
+            if channel.topic != "【故事測試】":
+                try: await channel.edit(topic="【故事測試】")
+                except: pass
+
+            await interaction.response.defer(ephemeral=True)
+
+            topic_index = bot.topic_index
+            game_channels = topic_index.channels(GAME, interaction.guild.id) + topic_index.channels(STORY_TEST, interaction.guild.id)
+
+            if not game_channels:
+                await interaction.followup.send("⚠️ 找不到任何主題為 `【接龍模式】` 或 `【故事測試】` 的頻道！", ephemeral=True)
+                return
+
+            scanned_channels = [ch.name for ch in game_channels]
+            words = [content for content, _, _ in bot.word_log.recent_words([ch.id for ch in game_channels], limit=10)]
+
+            if not words:
+                await interaction.followup.send(f"⚠️ 在 {', '.join(scanned_channels)} 找不到任何被機器人打勾的詞彙。", ephemeral=True)
+                return
+
+            all_words_str = "、".join(words)
+            await interaction.followup.send(f"✅ 抓取成功，正在生成...", ephemeral=True)
+
+            prompt = f"請根據以下詞彙寫一個超現實短篇故事：{all_words_str}"
+            try:
+                async with bot.overload.slot(interaction.guild.id, model_router.TEST_STORY) as call, metrics.llm_call("test_story"):
+                    chat_completion = await call.run(bot.router.complete(
+                        model_router.TEST_STORY,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.9,
+                    ))
+                story = chat_completion.choices[0].message.content
+                embed = discord.Embed(title=f"🧪 故事測試", description=story, color=0x00FFFF)
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            except Overloaded:
+                await interaction.followup.send("⏳ AI 現在很忙，測試故事先暫停，等一下再試吧！", ephemeral=True)
+            except Exception as e:
+                await interaction.followup.send(f"❌ AI 生成失敗：{e}", ephemeral=True)
+            return
+
+        # --- 設定面板 ---
+        if new_mode == "setup_panel":
+            if channel.topic != "【請勿濫用客服單】":
+                try: await channel.edit(topic="【請勿濫用客服單】")
+                except: pass
+            try: await interaction.message.delete()
+            except: pass
+
+            embed = discord.Embed(
+                title="如果您需要幫助或有任何問題，請點擊下方的按鈕開啟客服單。",
+                description="Click the button below to open a ticket.",
+                color=0x2b2d31
+            )
+            await channel.send(embed=embed, view=TicketLauncher())
+            await interaction.response.send_message(f"✅ 已發送客服面板！", ephemeral=True)
+            return
+
+        # --- 設定故事頻道 ---
+        if new_mode == "set_story_channel":
+            try:
+                await channel.edit(topic=STORY_TOPIC)
+                await interaction.response.send_message(f"✅ 設定成功！", ephemeral=True)
+            except:
+                await interaction.response.send_message(f"❌ 設定失敗", ephemeral=True)
+            return
+
+        # --- 接龍模式 ---
+        if new_mode == "game":
+            await interaction.response.defer()
+            config["mode"] = "game"
+            if channel.topic != "【接龍模式】":
+                try: await channel.edit(topic="【接龍模式】")
+                except: pass
+            config["game_last_word"] = ""
+            config["last_player_id"] = None
+            await interaction.followup.send(f"✅ 已切換為：**接龍遊戲模式**")
+            return
+
+        # --- AI 聊天模式 ---
+        if new_mode == "ai":
+            await interaction.response.defer()
+            config["mode"] = "ai"
+            if channel.topic != "【AI聊天模式】":
+                try: await channel.edit(topic="【AI聊天模式】")
+                except: pass
+            await interaction.followup.send(f"✅ 已切換為：**AI 聊天模式**")
+            return
+
+        # --- 關閉功能 ---
+        if new_mode == "idle":
+            await interaction.response.defer()
+            config["mode"] = "idle"
+            known_topics = ["【接龍模式】", "【AI聊天模式】", "【故事測試】", "【客服面板】"]
+            if channel.topic in known_topics:
+                try: await channel.edit(topic=None)
+                except: pass
+            await interaction.followup.send(f"💤 功能已關閉。")
+            return
+
+
+# ================= 3. 管理員指令 =================
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def menu(self, ctx):
+        await ctx.send("🔧 **管理員控制台**：", view=ModeSelectView())
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def cachestats(self, ctx):
+        """ 查看接龍裁判快取命中率 """
+        game = self.bot.get_cog("Game")
+        if game is None:
+            await ctx.send("⚠️ 接龍功能沒有載入")
+            return
+        verdict_cache = game.verdict_cache
+        total = verdict_cache.hits + verdict_cache.misses
+        await ctx.send(
+            f"📊 裁判快取：命中 {verdict_cache.hits} / {total} 次 "
+            f"({verdict_cache.hit_rate:.1%})，目前存了 {len(verdict_cache)} 個詞"
+        )
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def queuestats(self, ctx):
+        """ 查看接龍排隊狀況 """
+        game = self.bot.get_cog("Game")
+        if game is None:
+            await ctx.send("⚠️ 接龍功能沒有載入")
+            return
+        game_queue = game.queue
+        await ctx.send(
+            f"📊 接龍佇列：此頻道排隊 {game_queue.depth(ctx.channel.id)} 個，全部 {game_queue.depth()} 個 "
+            f"({game_queue.active_channels} 個頻道處理中)，已處理 {game_queue.processed} 個\n"
+            f"淘汰：過期 {game_queue.drops['stale']} 個，佇列滿 {game_queue.drops['overflow']} 個"
+            + (f"\n裁判批次：{game.batcher.batches} 批，平均每批 {game.batcher.average_batch:.1f} 個詞"
+               if game.batcher is not None else "")
+        )
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def outboundstats(self, ctx):
+        """ 查看各路由排隊等待時間 """
+        report = self.bot.outbound.report()
+        if not report:
+            await ctx.send("📊 目前還沒有排程過任何 Discord 動作")
+            return
+        lines = [f"`{route}`：{count} 次，平均等 {avg * 1000:.0f} ms，最久 {worst * 1000:.0f} ms"
+                 for route, (count, avg, worst) in sorted(report.items())]
+        await ctx.send("📊 Discord 動作排隊狀況\n" + "\n".join(lines))
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def aicache(self, ctx, seconds: float = None):
+        """ !aicache 300 = 這個頻道接受 5 分鐘內的快取回應，!aicache 0 = 關閉，不給秒數 = 查看快取狀況 """
+        if seconds is not None:
+            config = self.bot.get_channel_config(ctx.channel.id)
+            config["ai_cache_ttl"] = max(0.0, seconds)
+            if seconds > 0:
+                await ctx.send(f"✅ 此頻道的 AI 回覆會共用 {seconds:g} 秒內的快取 (開啟後不帶對話記憶)")
+            else:
+                await ctx.send("✅ 此頻道已關閉 AI 回覆快取")
+            return
+        cache = self.bot.response_cache
+        config = self.bot.channel_store.peek(ctx.channel.id)
+        ttl = config["ai_cache_ttl"] if config else 0
+        await ctx.send(
+            f"📊 AI 回覆快取：此頻道 {f'{ttl:g} 秒' if ttl else '未開啟'}；"
+            f"命中 {cache.hits} 次、併進同一請求 {cache.collapsed} 次、實際呼叫 {cache.misses} 次 "
+            f"({cache.hit_rate:.1%})，省下約 {cache.tokens_saved} tokens，目前存了 {len(cache)} 筆"
+        )
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def modelstats(self, ctx):
+        """ 查看各任務 / 模型的延遲與 token 用量 """
+        router = self.bot.router
+        report = router.report()
+        if not report:
+            await ctx.send("📊 目前還沒有呼叫過任何模型")
+            return
+        lines = [f"`{task}` {model}：{calls} 次，平均 {avg * 1000:.0f} ms，最久 {worst * 1000:.0f} ms，"
+                 f"token {prompt_tokens} + {completion_tokens}"
+                 for (task, model), (calls, avg, worst, prompt_tokens, completion_tokens) in sorted(report.items())]
+        lines.append(f"換備用模型 {router.fallbacks} 次，升級大模型 {router.escalations} 次")
+        await ctx.send("📊 模型路由狀況\n" + "\n".join(lines))
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def loadstats(self, ctx):
+        """ 查看 LLM 過載保護：負載、斷路器、各伺服器的狀況 """
+        state, load, total, guilds = self.bot.overload.report()
+        lines = [f"斷路器 {state}，負載 {load:.0%}，進行中 {total.in_flight}，"
+                 f"錯誤率 {total.errors:.0%}，擋下 {total.shed} 件"]
+        here = guilds.get(ctx.guild.id)
+        if here is not None:
+            guild_load, stats = here
+            lines.append(f"這個伺服器：負載 {guild_load:.0%}，進行中 {stats.in_flight}，"
+                         f"錯誤率 {stats.errors:.0%}，擋下 {stats.shed} 件")
+        await ctx.send("📊 LLM 過載保護\n" + "\n".join(lines))
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
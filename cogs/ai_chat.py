@@ -0,0 +1,131 @@
+import asyncio
+
+from discord.ext import commands
+
+import metrics
+import model_router
+from overload import Overloaded
+from response_cache import normalize_prompt
+from stream_reply import stream_reply, send_long
+
+BUSY_NOTICE = "⏳ AI 現在忙不過來，先休息一下，等等再問我吧！"
+
+
+class AIChat(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ================= AI 聊天記憶摘要 =================
+    async def summarize_dropped_turns(self, guild_id, channel_id, dropped):
+        """ 把被擠出記憶的舊對話併進摘要 (背景執行，失敗或 LLM 太忙就算了) """
+        chat_memory = self.bot.chat_memory
+        previous = chat_memory.summary(channel_id)
+        transcript = "\n".join(f"{user}\nAI：{assistant}" for user, assistant in dropped)
+        prompt = (
+            "請把「先前摘要」和「新的對話」合併成一段 100 字以內的摘要，保留人名、事實和還沒聊完的話題，只輸出摘要本身。\n"
+            f"先前摘要：{previous or '（無）'}\n新的對話：\n{transcript}"
+        )
+        try:
+            async with self.bot.overload.slot(guild_id, model_router.SUMMARY) as call, metrics.llm_call("summary"):
+                chat_completion = await call.run(self.bot.router.complete(
+                    model_router.SUMMARY,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                ))
+            chat_memory.set_summary(channel_id, chat_completion.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"對話摘要失敗: {e}")
+
+    def remember_turn(self, message, user_content, reply):
+        dropped = self.bot.chat_memory.record(message.channel.id, user_content, reply)
+        if dropped and self.bot.config.ai_memory_summary:
+            asyncio.create_task(self.summarize_dropped_turns(message.guild.id, message.channel.id, dropped))
+
+    # ================= AI 聊天 =================
+    async def notify(self, message, text):
+        """ LLM 太忙 / 出錯時的通知：同一個頻道一段時間內只說一次，不要每則訊息都洗一句 """
+        if self.bot.overload.should_notify(message.channel.id):
+            await message.channel.send(text)
+
+    async def cached_reply(self, message, key, ttl):
+        """ 開了回應快取的頻道：不帶對話記憶，同樣的問題直接用快取 / 同時問的併成一次請求 """
+        async def fetch():
+            async with self.bot.overload.slot(message.guild.id, model_router.CHAT) as call, metrics.llm_call("chat"):
+                chat_completion, answered_by = await call.run(self.bot.router.complete_with_route(
+                    model_router.CHAT,
+                    messages=[{"role": "user", "content": message.content}],
+                    temperature=0.7,
+                ))
+            usage = chat_completion.usage
+            # key 帶的是主模型；主模型逾時 / 429 改由備用模型回答的不要存，不然之後都拿到小模型的答案
+            keep = answered_by == model_router.PRIMARY
+            return chat_completion.choices[0].message.content, usage.total_tokens if usage else 0, keep
+
+        async with message.channel.typing():
+            try:
+                reply = await self.bot.response_cache.get_or_fetch(key, ttl, fetch)
+                await send_long(message.channel, reply)
+            except Overloaded:
+                await self.notify(message, BUSY_NOTICE)
+            except Exception as e:
+                await self.notify(message, f"AI 錯誤：{e}")
+
+    async def reply(self, message):
+        """ 帶著頻道記憶回覆一則訊息 """
+        config = self.bot.config
+        # 多人聊天時讓 AI 知道是誰在說話
+        user_content = f"{message.author.display_name}：{message.content}"
+        messages = self.bot.chat_memory.build_messages(message.channel.id, user_content)
+        if config.ai_streaming:
+            # 串流：先送「思考中」，邊收邊編輯，超過 2000 字自動接下一則
+            try:
+                async with self.bot.overload.slot(message.guild.id, model_router.CHAT) as call, metrics.llm_call("chat"):
+                    stats = await stream_reply(
+                        message.channel,
+                        call.stream(self.bot.router.stream(model_router.CHAT, messages=messages, temperature=0.7)),
+                        edit_interval=config.ai_stream_edit_interval,
+                    )
+                if stats["ttft"] is not None:
+                    metrics.LLM_FIRST_TOKEN_SECONDS.observe(stats["ttft"], site="chat")
+                ttft = f"{stats['ttft']:.2f}s" if stats["ttft"] is not None else "-"
+                print(f"🤖 AI 回覆 #{message.channel.name}：首字 {ttft}，總計 {stats['total']:.2f}s，"
+                      f"{stats['chars']} 字 / {stats['messages']} 則")
+                if stats["text"]:
+                    self.remember_turn(message, user_content, stats["text"])
+            except Overloaded:
+                await self.notify(message, BUSY_NOTICE)
+            except Exception as e:
+                await self.notify(message, f"AI 錯誤：{e}")
+            return
+
+        async with message.channel.typing():
+            try:
+                async with self.bot.overload.slot(message.guild.id, model_router.CHAT) as call, metrics.llm_call("chat"):
+                    chat_completion = await call.run(self.bot.router.complete(
+                        model_router.CHAT,
+                        messages=messages,
+                        temperature=0.7,
+                    ))
+                reply = chat_completion.choices[0].message.content
+                await send_long(message.channel, reply)
+                self.remember_turn(message, user_content, reply)
+            except Overloaded:
+                await self.notify(message, BUSY_NOTICE)
+            except Exception as e:
+                await self.notify(message, f"AI 錯誤：{e}")
+
+    # AI 聊天模式
+    @commands.Cog.listener()
+    async def on_ai_message(self, message, config):
+        with metrics.ON_MESSAGE_SECONDS.time(mode="ai"):
+            prompt = normalize_prompt(message.content)
+            if config["ai_cache_ttl"] > 0 and prompt:
+                # key 帶上模型和溫度，換了模型就不會拿到舊模型的回答
+                key = (self.bot.router.routes[model_router.CHAT].model, 0.7, prompt)
+                await self.cached_reply(message, key, config["ai_cache_ttl"])
+            else:
+                await self.reply(message)
+
+
+async def setup(bot):
+    await bot.add_cog(AIChat(bot))
@@ -0,0 +1,267 @@
+import time
+
+import discord
+from discord.ext import commands
+
+import metrics
+import model_router
+from accepted_index import AcceptedIndex
+from game_queue import ChannelWorkQueue
+from judge import (JUDGE_PROMPT_VERSION, REQUEST_OPTIONS, DEFAULT_REASON, UNPARSEABLE_REASON,
+                   build_judge_messages, is_confident_verdict, parse_verdict,
+                   build_batch_messages, batch_acceptor, batch_request_options, parse_batch_verdicts)
+from judge_batcher import JudgeBatcher
+from lexicon import Lexicon
+from overload import Overloaded
+from topic_index import GAME
+from verdict_cache import VerdictCache
+from word_log import ACCEPT, EDIT, DELETE
+
+
+class Game(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        config = bot.config
+        # 裁判快取 (存在資料庫，重啟後保留)
+        self.verdict_cache = VerdictCache(bot.connect_db(), max_entries=config.verdict_cache_size,
+                                          ttl=config.verdict_cache_ttl_days * 86400)
+        # 本機詞庫 (找不到檔案就只做亂打偵測，其餘交給 LLM)
+        self.lexicon = Lexicon(config.lexicon_path)
+        self.queue = ChannelWorkQueue(self.play_word, max_depth=config.game_queue_depth)
+        # 最近通過的詞 (訊息ID -> 內容)，抓包編輯 / 刪除不用靠 discord.py 的訊息快取
+        self.accepted = AcceptedIndex(per_channel=config.accepted_index_size,
+                                      loader=lambda channel_id, limit: bot.word_log.recent_accepted(channel_id, limit))
+        # 各頻道同時送來的候選詞合成一批問 LLM
+        self.batcher = None
+        if config.judge_batch_window > 0 and config.judge_batch_size > 1:
+            self.batcher = JudgeBatcher(self.judge_batch, window=config.judge_batch_window,
+                                        max_batch=config.judge_batch_size)
+        metrics.VERDICT_CACHE_HIT_RATIO.track(lambda: self.verdict_cache.hit_rate)
+        metrics.VERDICT_CACHE_ENTRIES.track(lambda: len(self.verdict_cache))
+        metrics.GAME_QUEUE_DEPTH.track(lambda: self.queue.depth())
+        metrics.ACCEPTED_INDEX_ENTRIES.track(lambda: len(self.accepted))
+
+    def cog_unload(self):
+        self.lexicon.close()
+        if self.batcher is not None:
+            self.batcher.close()
+
+    async def ask_judge(self, current_word, guild_id=None):
+        """ 單詞問 LLM，回傳 (是否通過, 理由)，看不懂回傳 None """
+        async with self.bot.overload.slot(guild_id, model_router.JUDGE) as call, metrics.llm_call("judge"):
+            chat_completion = await call.run(self.bot.router.complete(
+                model_router.JUDGE,
+                messages=build_judge_messages(current_word),
+                accept=is_confident_verdict,
+                **REQUEST_OPTIONS,
+            ))
+        return parse_verdict(chat_completion.choices[0].message.content)
+
+    async def judge_batch(self, words):
+        """ 批次問 LLM，回傳每個詞的 (是否通過, 理由) 或 None；只有一個詞就用單詞 prompt """
+        if len(words) == 1:
+            return [await self.ask_judge(words[0])]
+        # 一批混了好幾個伺服器的詞，只算進全域負載
+        async with self.bot.overload.slot(None, model_router.JUDGE) as call, metrics.llm_call("judge_batch"):
+            chat_completion = await call.run(self.bot.router.complete(
+                model_router.JUDGE,
+                messages=build_batch_messages(words),
+                accept=batch_acceptor(len(words)),
+                **batch_request_options(len(words)),
+            ))
+        return parse_batch_verdicts(chat_completion.choices[0].message.content, len(words))
+
+    def llm_saturated(self):
+        """ LLM 塞住了 (排隊等 slot 的請求至少還有一輪)：這時候才值得等一下湊批次，不然一詞一次比較快 """
+        llm = self.bot.llm
+        return llm.waiting >= llm.max_in_flight
+
+    async def judge_word(self, current_word, guild_id=None):
+        """ 判斷詞彙是否通過，回傳 (是否通過, 不通過時酸人的理由)；LLM 忙不過來丟出 Overloaded """
+        # 第一關：本機詞庫 / 亂打偵測，不用等 LLM
+        local = self.lexicon.classify(current_word)
+        if local is True:
+            return True, ""
+        if local is False:
+            return False, f"「{current_word}」是鍵盤卡住了還是在練習打字？同一個字狂按不叫造詞！"
+
+        cached = self.verdict_cache.get(current_word, JUDGE_PROMPT_VERSION)
+        if cached is not None:
+            return cached
+
+        verdict = None
+        if self.batcher is not None and self.llm_saturated():
+            # 排進批次前先看這個伺服器還能不能用 LLM，真正送出時批次本身再過一次過載保護
+            self.bot.overload.check(guild_id, model_router.JUDGE, probe=False)
+            verdict = await self.batcher.judge(current_word)
+        if verdict is None:
+            # 沒開批次，或是批次回應漏了這個詞：單獨再問一次
+            verdict = await self.ask_judge(current_word, guild_id)
+        if verdict is None:
+            # 大模型也回了看不懂的東西：這次先擋下，但不寫進快取，下次再問
+            print(f"⚠️ 裁判回應無法解析：{current_word}")
+            return False, UNPARSEABLE_REASON
+        if not verdict[0] and not verdict[1]:
+            verdict = (False, DEFAULT_REASON)
+
+        self.verdict_cache.put(current_word, JUDGE_PROMPT_VERSION, *verdict)
+        return verdict
+
+    # ================= 接龍遊戲 =================
+    async def play_word(self, item):
+        """ 頻道佇列的 handler：item = (訊息, 排隊當下的上一個詞, 排進佇列的時間) """
+        message, seen_last_word, enqueued_at = item
+        try:
+            await self.judge_message(message, seen_last_word)
+        finally:
+            # 接龍分支的處理時間 = 排隊 + 裁判 + 排進 ✅ / ❌，跟 AI 聊天一樣算到回應送出為止
+            metrics.ON_MESSAGE_SECONDS.observe(time.perf_counter() - enqueued_at, mode="game")
+
+    async def judge_message(self, message, seen_last_word):
+        outbound = self.bot.outbound
+        config = self.bot.get_channel_config(message.channel.id)
+        if config["mode"] != "game":
+            return
+
+        last_word = config["game_last_word"]
+        current_word = message.content.strip()
+
+        # 排隊期間已經有人接上了：接不上新詞尾的候選詞直接淘汰，不用問 LLM
+        if last_word and last_word != seen_last_word and current_word[:1] != last_word[-1]:
+            self.queue.drop_stale()
+            outbound.react(message, "❌")
+            return
+
+        if last_word == "":
+            if len(current_word) < 2:
+                outbound.react(message, "❌")
+                outbound.rebuke(message.channel, "裁判：起頭至少要兩個字啦！")
+                return
+            pass
+
+        else:
+            if config["last_player_id"] == message.author.id:
+                 outbound.react(message, "❌")
+                 outbound.rebuke(message.channel, "不能自己接自己的龍！給別人一點機會！")
+                 return
+
+            if len(current_word) < 2:
+                 outbound.react(message, "❌")
+                 outbound.rebuke(message.channel, "裁判：太短了！請至少輸入兩個字。")
+                 return
+
+            if current_word[0] == current_word[-1]:
+                outbound.react(message, "❌")
+                outbound.rebuke(message.channel, f"裁判：又來了！「{current_word}」首尾字相同，禁止無限迴圈！")
+                return
+
+            if current_word[0] != last_word[-1]:
+                outbound.react(message, "❌")
+                outbound.rebuke(message.channel, f"裁判：眼睛還好嗎？上一句結尾是「**{last_word[-1]}**」，你接「**{current_word[0]}**」是想去哪？")
+                return
+
+        try:
+            is_valid, reason = await self.judge_word(current_word, message.guild.id)
+
+            if is_valid:
+                config["game_last_word"] = current_word
+                config["last_player_id"] = message.author.id
+                self.bot.word_log.append(ACCEPT, message.channel.id, message.id, current_word, message.created_at,
+                                         guild_id=message.guild.id, author_id=message.author.id)
+                self.accepted.add(message.channel.id, message.id, current_word,
+                                  author_id=message.author.id, author_name=message.author.display_name)
+                outbound.react(message, "✅")
+            else:
+                outbound.react(message, "❌")
+                outbound.rebuke(message.channel, reason)
+        except Overloaded:
+            # LLM 忙不過來 / 斷路器打開：這個詞先不判 (不算通過也不算出局)，每個頻道只通知一次
+            outbound.react(message, "⏳")
+            if self.bot.overload.should_notify(message.channel.id):
+                outbound.send(message.channel, content="⏳ 裁判忙不過來，剛剛的詞先不算，等一下再接吧！")
+        except Exception as e:
+            if self.bot.overload.should_notify(message.channel.id):
+                outbound.rebuke(message.channel, f"裁判恍神了: {e}")
+
+    # 接龍模式 (排進頻道佇列，依到達順序一個一個判)
+    @commands.Cog.listener()
+    async def on_game_message(self, message, config):
+        enqueued_at = time.perf_counter()
+        if not self.queue.submit(message.channel.id, (message, config["game_last_word"], enqueued_at)):
+            self.bot.outbound.react(message, "❌")
+            metrics.ON_MESSAGE_SECONDS.observe(time.perf_counter() - enqueued_at, mode="game")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self.lexicon.loaded:
+            print(f"📚 已載入本機詞庫：{self.bot.config.lexicon_path}")
+        else:
+            print(f"⚠️ 找不到本機詞庫 {self.bot.config.lexicon_path}，只做亂打偵測")
+
+        # 進度都存在資料庫裡，不用再去翻每個頻道的歷史訊息
+        print("🔄 正在恢復設定...")
+        for channel in self.bot.topic_index.channels(GAME):
+            config = self.bot.get_channel_config(channel.id)
+            config["mode"] = "game"
+            if config["game_last_word"]:
+                print(f"   └─ 接龍頻道 {channel.name} 已恢復進度：{config['game_last_word']}")
+            else:
+                print(f"   └─ 接龍頻道 {channel.name} 尚無進度")
+
+    # === [監聽刪除訊息] (抓包刪留言) ===
+    # raw 事件：不管訊息在不在 discord.py 的快取裡都會觸發，用通過詞索引判斷，不打 REST
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        config = self.bot.channel_store.peek(payload.channel_id)
+        if config is None or config["mode"] != "game": return
+
+        word = self.accepted.pop(payload.channel_id, payload.message_id)
+        if word is None: return
+        self.bot.word_log.append(DELETE, payload.channel_id, payload.message_id, word.content, discord.utils.utcnow(),
+                                 guild_id=payload.guild_id, author_id=word.author_id)
+
+        # 如果是被刪除的留言 且 是目前的最新進度
+        if word.content == config["game_last_word"]:
+            channel = self.bot.get_channel(payload.channel_id)
+            if channel is None: return
+            last_char = config["game_last_word"][-1]
+            user_name = word.author_name or (payload.cached_message.author.display_name if payload.cached_message
+                                             else f"<@{word.author_id}>")
+            self.bot.outbound.send(
+                channel,
+                content=f"😡 **{user_name}** 太壞了，偷偷刪掉已經通過的留言，滾出去！\n"
+                f"👉 下一個字還是要接「**{last_char}**」喔！"
+            )
+
+    # === [監聽編輯訊息] (抓包偷改留言) ===
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload):
+        config = self.bot.channel_store.peek(payload.channel_id)
+        if config is None or config["mode"] != "game": return
+
+        word = self.accepted.get(payload.channel_id, payload.message_id)
+        if word is None: return
+        after = payload.message
+        content = after.content.strip()
+        if content == word.content: return  # 只是連結預覽 / 嵌入更新，內容沒變
+
+        self.bot.word_log.append(EDIT, payload.channel_id, payload.message_id, content, discord.utils.utcnow(),
+                                 guild_id=payload.guild_id, author_id=word.author_id)
+        edited_last_word = word.content == config["game_last_word"]
+        word.content = content
+
+        if edited_last_word:
+            last_char = config["game_last_word"][-1]
+            self.bot.outbound.send(
+                after.channel,
+                content=f"👀 **{after.author.display_name}** 別以為我沒看到！想偷改已經通過的答案？不可饒恕！\n"
+                f"👉 下一個字還是要接「**{last_char}**」喔！"
+            )
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.accepted.forget_channel(channel.id)
+
+
+async def setup(bot):
+    await bot.add_cog(Game(bot))
@@ -0,0 +1,223 @@
+import asyncio
+import datetime
+
+import discord
+import pytz
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from discord.ext import commands
+
+import metrics
+import model_router
+from story_chunking import estimate_tokens, chunk_words
+from story_pipeline import StoryPipeline, StoryProgress
+from topic_index import GAME, STORY_OUTPUT
+
+TAIPEI = pytz.timezone('Asia/Taipei')
+STORY_DEFER_SECONDS = 600  # LLM 太忙時每日故事最多延後多久 (秒)
+MIN_FRAGMENT_LENGTH = 100  # 分批生成時每段最少幾個字
+
+
+# ================= 每日故事系統 =================
+def build_story_prompt(words):
+    """ 把詞彙清單組成說書人 prompt """
+    word_count = len(words)
+
+    # === [修改] 字數運算與限制 ===
+    # 1. 先算出原始長度 (每1個詞換50個字)
+    raw_length = word_count * 50
+
+    # 2. 使用 min/max 限制範圍 (最小 200，最大 2000)
+    target_length = max(200, min(raw_length, 2000))
+    # ===========================
+
+    all_words_str = "、".join(words)
+
+    prompt = f"""
+        【角色設定】：你是一位擅長一本正經胡說八道的說書人。
+
+        【任務】：請將以下「指定詞彙」串連起來，編寫一個短篇故事。
+
+        【指定詞彙】：{all_words_str}
+
+        【寫作規則】：
+        1. **風格要求**：故事必須充滿「荒謬的邏輯性」。也就是說，雖然劇情發展很離譜，但你要用非常嚴肅、理所當然的語氣把它講得頭頭是道。
+        2. **禁止事項**：**絕對不要**在故事中提到「一本正經胡說八道」、「說書人」、「作者」或「接龍」等詞彙。不要打破第四面牆，直接進入故事世界。
+        3. **詞彙運用**：必須包含所有指定詞彙，且要自然融入，不要像是在列清單。
+        4. **字數限制**：大約 {target_length} 字。
+        5. **幽默感**：請加入一些諷刺或意想不到的反轉，讓讀者覺得「我看了什麼，但好像又有道理」。
+        6. **結尾**：故事結束了就結束了，不要加入結語。
+        現在，請直接開始講故事：
+        """
+    return prompt
+
+def build_fragment_prompt(words, part, total_parts, fragment_length):
+    """ 分批模式：每一批詞彙先寫成故事的其中一段 """
+    all_words_str = "、".join(words)
+    return f"""
+        【任務】：你正在寫一個荒謬但一本正經的故事，這是全部 {total_parts} 段中的第 {part} 段。
+        請用以下「指定詞彙」寫出這一段的劇情。
+
+        【指定詞彙】：{all_words_str}
+
+        【寫作規則】：
+        1. 用非常嚴肅、理所當然的語氣講離譜的劇情。
+        2. 必須包含所有指定詞彙，且要自然融入，不要像是在列清單。
+        3. 不要提到「說書人」、「作者」或「接龍」，不要寫開場白或結語。
+        4. 大約 {fragment_length} 字。
+        現在，請直接寫出這一段：
+        """
+
+def stitch_share(stitch_tokens, parts):
+    """ 串接預算平均分給每一段的字數；LLM 常常寫超過要求的字數，留一成餘裕 """
+    return stitch_tokens * 9 // 10 // parts
+
+def build_stitch_prompt(fragments, target_length):
+    """ 分批模式：把所有片段串成一篇完整故事 """
+    parts = "\n\n".join(f"【第 {i} 段】\n{fragment}" for i, fragment in enumerate(fragments, 1))
+    return f"""
+        【角色設定】：你是一位擅長一本正經胡說八道的說書人。
+
+        【任務】：以下是同一個故事的幾個片段，請把它們改寫、串連成一個完整的短篇故事。
+
+        {parts}
+
+        【寫作規則】：
+        1. **風格要求**：保留「荒謬的邏輯性」，用嚴肅、理所當然的語氣把離譜的劇情講得頭頭是道。
+        2. **禁止事項**：**絕對不要**提到「一本正經胡說八道」、「說書人」、「作者」、「片段」或「接龍」等詞彙。
+        3. **詞彙運用**：片段裡出現的關鍵詞彙盡量保留，段落之間要自然銜接。
+        4. **字數限制**：大約 {target_length} 字。
+        5. **結尾**：故事結束了就結束了，不要加入結語。
+        現在，請直接開始講故事：
+        """
+
+
+class Story(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # 每日故事每個頻道的進度，重啟後可以接著跑 (多行程時各自記錄自己那幾個 shard)
+        self.progress = StoryProgress(bot.connect_db(), scope=bot.scope)
+        self.lock = asyncio.Lock()  # 同一時間只跑一輪 (排程 + 重啟接續可能撞在一起，後來的排隊等)
+        self.scheduler = None
+
+    def cog_unload(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+
+    async def generate_story(self, source_channel, words):
+        config = self.bot.config
+
+        async def ask(prompt):
+            # 每日故事不趕時間：LLM 太忙就延後，最多等 STORY_DEFER_SECONDS 秒
+            async with self.bot.overload.slot(source_channel.guild.id, model_router.STORY, wait=STORY_DEFER_SECONDS) as call, \
+                    metrics.llm_call("story"):
+                chat_completion = await call.run(self.bot.router.complete(
+                    model_router.STORY,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                ))
+            return chat_completion.choices[0].message.content
+
+        # 先在本機估算 token，詞彙不多就照舊一次生成
+        batches = chunk_words(words, config.story_chunk_tokens)
+        if len(batches) == 1:
+            return await ask(build_story_prompt(words))
+
+        # map：每批各寫一段 (並行)，片段長度依批數縮小，盡量讓最後串接時塞得進去
+        fragment_length = max(MIN_FRAGMENT_LENGTH, stitch_share(config.story_stitch_tokens, len(batches)))
+        print(f"   🧩 {source_channel.name}：{len(words)} 個詞 (約 {estimate_tokens('、'.join(words))} tokens)，分成 {len(batches)} 批生成")
+        fragments = await asyncio.gather(*(
+            ask(build_fragment_prompt(batch, i, len(batches), fragment_length))
+            for i, batch in enumerate(batches, 1)
+        ))
+
+        # 批數太多時片段有最短長度，加起來會超過串接預算：先分組串成較長的片段，再串那些結果，直到一次塞得下
+        while True:
+            groups = chunk_words(fragments, config.story_stitch_tokens, separator="")
+            if len(groups) == 1 or len(groups) == len(fragments):
+                break
+            group_length = max(MIN_FRAGMENT_LENGTH, stitch_share(config.story_stitch_tokens, len(groups)))
+            print(f"   🧵 {source_channel.name}：{len(fragments)} 段超過串接預算，先分成 {len(groups)} 組串接")
+            fragments = await asyncio.gather(*(ask(build_stitch_prompt(group, group_length)) for group in groups))
+
+        # reduce：串成完整故事
+        target_length = max(200, min(len(words) * 50, 2000))
+        return await ask(build_stitch_prompt(fragments, target_length))
+
+    async def generate_daily_story(self, run_date=None):
+        """ 每天早上8點執行的任務 (抓取最新)；帶 run_date 代表接續一輪沒跑完的 """
+        print(f"⏰ [排程啟動] 開始生成每日故事 - {datetime.datetime.now()}")
+        topic_index = self.bot.topic_index
+
+        story_output_channels = {}
+        for guild in self.bot.guilds:
+            channel = topic_index.first(STORY_OUTPUT, guild.id)
+            if channel:
+                story_output_channels[guild.id] = channel
+
+        if not story_output_channels:
+            print("⚠️ 找不到任何【故事專用】頻道，跳過生成。")
+            return
+
+        target_game_channels = topic_index.channels(GAME)
+
+        if not target_game_channels:
+            print("⚠️ 找不到任何【接龍模式】頻道，跳過生成。")
+            return
+
+        # 時間範圍以排程觸發的時間為準，排隊等了多久都不影響
+        now = datetime.datetime.now(TAIPEI)
+        run_date = run_date or now.strftime("%Y-%m-%d")
+        if self.lock.locked():
+            print(f"⏳ 上一輪每日故事還在跑，{run_date} 這輪等它跑完再開始。")
+        # 排在上一輪後面，不要直接跳過 (不然這天的故事就沒了)；同一個頻道不會重做，有進度表和租約擋著
+        async with self.lock:
+            window_start, window_end = await self.progress.start_run(
+                run_date, (now - datetime.timedelta(days=1)).timestamp(), now.timestamp()
+            )
+            yesterday = datetime.datetime.fromtimestamp(window_start, TAIPEI)
+            word_log = self.bot.word_log
+
+            def collect(source_channel):
+                return [content for content, _, _ in word_log.accepted_words(source_channel.id, since=window_start, until=window_end)]
+
+            async def publish(source_channel, target_output_channel, story, word_count):
+                embed = discord.Embed(
+                    title=f"📜 {yesterday.strftime('%m/%d')} 的宇宙故事",
+                    description=story,
+                    color=0xFFD700
+                )
+                embed.set_footer(text=f"擷取自 #{source_channel.name} • {yesterday.strftime('%m/%d %H:%M')} 至今 • 共 {word_count} 個詞")
+                await target_output_channel.send(embed=embed)
+
+            jobs = [
+                (source_channel, story_output_channels[source_channel.guild.id])
+                for source_channel in target_game_channels
+                if source_channel.guild.id in story_output_channels
+            ]
+            # 每個行程都會排程到，但同一個頻道只會被一個行程做 (搶 shared_state 的租約)
+            pipeline = StoryPipeline(self.progress, collect, self.generate_story, publish, workers=self.bot.config.story_workers,
+                                     lease=self.bot.shared_state, owner=self.bot.instance_id,
+                                     lease_ttl=self.bot.config.story_lease_seconds)
+            await pipeline.run(run_date, jobs)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 斷線重連也會觸發 on_ready，排程器只開一次
+        if self.scheduler is not None:
+            return
+        self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_job(self.generate_daily_story, CronTrigger(hour=8, minute=0, timezone=TAIPEI))
+        self.scheduler.start()
+        print("⏰ 排程器已啟動")
+
+        # 上一輪每日故事如果中途被打斷 (重啟/當機)，接著把沒做完的頻道做完
+        unfinished = self.progress.unfinished_run()
+        if unfinished:
+            print(f"↪️ 發現未完成的每日故事 {unfinished}，繼續執行")
+            asyncio.create_task(self.generate_daily_story(run_date=unfinished))
+
+
+async def setup(bot):
+    await bot.add_cog(Story(bot))
@@ -0,0 +1,248 @@
+import asyncio
+
+import discord
+from discord.ext import commands
+
+import pytz
+from outbound import INTERACTION, CLEANUP
+from ticket_registry import PANEL, LEGACY
+
+TAIPEI = pytz.timezone('Asia/Taipei')
+
+
+# ================= 工具函式：延遲刪除訊息 =================
+async def delete_after_delay(message, delay):
+    """ 等待指定秒數後刪除訊息 """
+    await asyncio.sleep(delay)
+    try:
+        await message.delete()
+    except:
+        pass
+
+
+# ================= 1. 客服單系統邏輯 =================
+
+# --- 管理員專用按鈕 (灰色) ---
+class AdminTicketCloser(discord.ui.View):
+    """ 管理員專用的關閉按鈕 (灰色 + 權限檢查) """
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="關閉客服單", style=discord.ButtonStyle.secondary, custom_id="close_ticket_admin", emoji="🔒")
+    async def close_admin(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # 權限檢查
+        if not interaction.user.guild_permissions.manage_channels:
+            await interaction.response.send_message("❌ 只有管理員可以使用此按鈕！", ephemeral=True)
+            return
+
+        await interaction.response.send_message("🔒 管理員執行關閉...", ephemeral=True)
+        await asyncio.sleep(2)
+        await interaction.channel.delete()
+
+
+class TicketControlView(discord.ui.View):
+    """ 藍色退出按鈕 (給開啟者用) """
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="退出此客服單", style=discord.ButtonStyle.primary, custom_id="leave_ticket", emoji="👋")
+    async def leave_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # 0. 檢查是不是管理員
+        if interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ 您是管理員，無法退出頻道 (權限最高級)。", ephemeral=True)
+            return
+
+        # 1. 公開回覆 (修改這裡：改成所有人可見的公告)
+        embed = discord.Embed(
+            description=f"👋 **{interaction.user.mention}** 已自行退出此客服單。",
+            color=0x99aab5 # 灰色系
+        )
+        await interaction.response.send_message(embed=embed) # 預設 ephemeral=False，所以大家看得到
+
+        # 2. 修改權限：將該使用者的「讀取訊息」權限設為 False -> 頻道直接消失
+        await interaction.channel.set_permissions(interaction.user, read_messages=False)
+
+
+class TicketCloser(discord.ui.View):
+    """ 紅色臨時關閉按鈕 (給使用者誤觸時取消用) """
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="點此關閉客服單", style=discord.ButtonStyle.danger, custom_id="close_ticket_internal", emoji="🔒")
+    async def close_ticket_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message("🔒 客服單關閉中...", ephemeral=True)
+        await asyncio.sleep(2)
+        await interaction.channel.delete()
+
+
+# --- 開單後的整合面板：詳細資料 + 三種按鈕放在同一則訊息 ---
+def build_ticket_embeds(owner, opened_at, include_temp=True):
+    """ 客服單面板的 embeds；開單者發言後 include_temp=False 重畫一次，拿掉紅色區塊 """
+    time_str = opened_at.astimezone(TAIPEI).strftime("%Y-%m-%d %H:%M:%S")
+
+    # 詳細資料 (土黃色)
+    info_embed = discord.Embed(
+        title="新的客服單已開啟",
+        description="請稍候，管理員將會盡快為您服務。",
+        color=0xdc8f65
+    )
+    info_embed.add_field(
+        name="🥜 詳細資料",
+        value=f"╰ 開啟者: {owner.display_name}\n╰ 開啟時間: {time_str}",
+        inline=False
+    )
+
+    # 管理員控制台 (土黃色 + 灰色按鈕)
+    admin_embed = discord.Embed(
+        title="🔒 管理員控制台",
+        description="此按鈕永久有效，問題解決後請點擊下方按鈕關閉頻道。",
+        color=0xdc8f65
+    )
+
+    # 給開啟者的「退出按鈕」 (藍色)
+    leave_embed = discord.Embed(
+        description="如果您不需要協助了，可以點擊下方按鈕直接**退出**此頻道。\n(頻道不會被刪除，管理員仍可看到內容)",
+        color=0x3498db
+    )
+    embeds = [info_embed, admin_embed, leave_embed]
+
+    # 給開啟者的「臨時紅色按鈕」
+    if include_temp:
+        embeds.append(discord.Embed(
+            description=f"🛑 **{owner.mention} 專用選項**\n在您**開始對話前**，若發現誤觸，可直接點此關閉房間。\n(此按鈕將在您發言後自動消失)",
+            color=0xff0000
+        ))
+    return embeds
+
+
+class TicketPanelView(discord.ui.View):
+    """ 把灰色 / 藍色 / 紅色按鈕放在同一則訊息；custom_id 不變，點擊仍由原本註冊的 View 處理 """
+    def __init__(self, include_temp=True):
+        super().__init__(timeout=None)
+        sources = [AdminTicketCloser(), TicketControlView()]
+        if include_temp:
+            sources.append(TicketCloser())
+        for source in sources:
+            for item in source.children:
+                self.add_item(item)
+
+
+async def remove_temp_button(channel, owner, message_id, layout):
+    """ 開單者開始發言：直接用訊息 ID 編輯/刪除，不用先 fetch """
+    if layout is None:
+        # 升級前留下的登記，不知道是哪一種版面，只好抓一次來看
+        layout = PANEL if len((await channel.fetch_message(message_id)).embeds) > 1 else LEGACY
+    panel = channel.get_partial_message(message_id)
+    if layout == LEGACY:
+        await panel.delete()  # 舊版客服單：紅色按鈕是獨立的一則訊息
+        return
+    await panel.edit(
+        embeds=build_ticket_embeds(owner, channel.created_at, include_temp=False),
+        view=TicketPanelView(include_temp=False),
+    )
+
+
+class TicketLauncher(discord.ui.View):
+    """ 大廳的綠色按鈕 """
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @discord.ui.button(label="開啟客服單", style=discord.ButtonStyle.success, custom_id="create_ticket", emoji="🎫")
+    async def create_ticket_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+
+        bot = interaction.client
+        ticket_registry = bot.ticket_registry
+        guild = interaction.guild
+        ticket_name = f"客服單：{interaction.user.display_name.lower()}"
+
+        # 1. 檢查是否已存在 (查登記簿，改名也抓得到)
+        existing = None
+        existing_id = ticket_registry.get(guild.id, interaction.user.id)
+        if existing_id:
+            existing = guild.get_channel(existing_id)
+            if existing is None:
+                ticket_registry.remove_channel(existing_id)  # 頻道已經不在了，登記作廢
+        if existing:
+            msg = await bot.outbound.followup(
+                interaction,
+                content=f"❌ 您已經有一個客服單囉：{existing.mention}\n(此訊息將在 1 分鐘後自動刪除)",
+                ephemeral=True
+            )
+            asyncio.create_task(delete_after_delay(msg, 60))
+            return
+
+        # 2. 建立新頻道
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            interaction.user: discord.PermissionOverwrite(read_messages=True, send_messages=True),
+            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+        }
+
+        try:
+            cat = interaction.channel.category
+            chan = await guild.create_text_channel(
+                name=ticket_name,
+                overwrites=overwrites,
+                category=cat
+            )
+
+            # 3. 記錄開單者 ID
+            ticket_registry.add(guild.id, interaction.user.id, chan.id)
+
+            # 4. 所有資訊與按鈕放在同一則訊息 (一次 REST 呼叫)
+            panel = await bot.outbound.send(
+                chan,
+                priority=INTERACTION,
+                content=f"@🪐宇宙的起源 {interaction.user.mention}",
+                embeds=build_ticket_embeds(interaction.user, chan.created_at),
+                view=TicketPanelView(),
+            )
+
+            # 5. 記錄訊息 ID (開單者發言後要把紅色按鈕拿掉)
+            ticket_registry.set_temp_button(chan.id, interaction.user.id, panel.id, PANEL)
+
+            # 6. 回覆大廳
+            msg = await bot.outbound.followup(
+                interaction,
+                content=f"✅ 客服單已建立。\n(此訊息將在 1 分鐘後自動刪除)",
+                ephemeral=True
+            )
+            asyncio.create_task(delete_after_delay(msg, 60))
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ 建立失敗：{e}", ephemeral=True)
+
+
+class Tickets(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        # 註冊所有按鈕 (重啟後舊訊息上的按鈕還能用)
+        self.bot.add_view(TicketLauncher())
+        self.bot.add_view(TicketCloser())       # 紅
+        self.bot.add_view(TicketControlView())  # 藍
+        self.bot.add_view(AdminTicketCloser())  # 灰
+
+    # === 偵測客服單開單者說話，拿掉臨時按鈕 (只有還掛著紅色按鈕的頻道會命中) ===
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author == self.bot.user or not isinstance(message.channel, discord.TextChannel):
+            return
+        pending = self.bot.ticket_registry.pop_temp_button(message.channel.id, message.author.id)
+        if pending:
+            self.bot.outbound.submit(CLEANUP, "delete", message.channel.id,
+                                     lambda: remove_temp_button(message.channel, message.author, *pending))
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.bot.ticket_registry.remove_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.bot.ticket_registry.remove_guild(guild.id)
+
+
+async def setup(bot):
+    await bot.add_cog(Tickets(bot))
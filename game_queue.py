@@ -0,0 +1,55 @@
+import asyncio
+from collections import deque
+
+# ================= 接龍排隊處理 =================
+# 同一個頻道的候選詞依照到達順序一個一個判，避免兩個人同時接同一個詞尾都被 ✅。
+# 每個頻道只有在有東西排隊時才會有 worker，排空了 worker 就結束，不會留一堆閒置 task。
+
+
+class ChannelWorkQueue:
+    def __init__(self, handler, max_depth=50):
+        self.handler = handler          # async handler(item)
+        self.max_depth = max_depth
+        self.drops = {"stale": 0, "overflow": 0}
+        self.processed = 0
+        self._queues = {}   # channel_id -> deque
+        self._workers = {}  # channel_id -> Task
+
+    def submit(self, channel_id, item):
+        """ 排進頻道佇列，佇列滿了回傳 False """
+        queue = self._queues.setdefault(channel_id, deque())
+        if len(queue) >= self.max_depth:
+            self.drops["overflow"] += 1
+            return False
+        queue.append(item)
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(self._work(channel_id))
+        return True
+
+    async def _work(self, channel_id):
+        queue = self._queues[channel_id]
+        try:
+            while queue:
+                item = queue.popleft()
+                try:
+                    await self.handler(item)
+                except Exception as e:
+                    print(f"⚠️ 頻道 {channel_id} 處理失敗：{e}")
+                self.processed += 1
+        finally:
+            del self._workers[channel_id]
+            if not queue:
+                del self._queues[channel_id]
+
+    def drop_stale(self):
+        """ 給 handler 用：記錄一筆「排隊期間已經過期」的淘汰 """
+        self.drops["stale"] += 1
+
+    def depth(self, channel_id=None):
+        if channel_id is not None:
+            return len(self._queues.get(channel_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def active_channels(self):
+        return len(self._workers)
@@ -0,0 +1,119 @@
+import json
+import re
+
+# ================= 接龍裁判 (LLM 那一關) =================
+# 固定的審核規則只建一次，當 system message 送出 (每次都是同一段前綴，Groq 端可以重用快取)，
+# user turn 只放要判的詞。回應要求 JSON：{"ok": true/false, "reason": "..."}，
+# 解析不了 JSON 時退回找 YES / NO，不會因為模型在前面多講一句話就被當成拒絕。
+#
+# 離線評估：python bench/eval_judge.py (對照舊版 prompt 的準確率與每次 token 數)
+
+JUDGE_PROMPT_VERSION = 2  # 修改裁判 prompt 時請 +1，舊的快取判決就不會再被使用
+
+JUDGE_RULES = (
+    "你是中文接龍的語法裁判。使用者每次只給一串文字，你只判斷兩件事：詞彙是否真實存在、排列是否符合中文文法。\n"
+    "只看語言，不看現實邏輯：荒謬、超現實也要通過（例：龍棲息在地上、義大利麵拌42號混凝土、我把太陽一口吞了）。\n"
+    "要拒絕：亂打的字（能季去次）、贅字堆疊（大大大吃吃吃）、文法錯亂（森林跑去兔子）、"
+    "每個字都認識但沒人這樣講的亂造詞（上米、什好）。\n"
+    "兼類詞（游泳、喜歡）依上下文判斷詞性。\n"
+)
+REASON_RULE = "不通過時 ok 為 false，reason 用 20~35 字狠狠酸他詞彙貧乏或亂打字（不要酸邏輯）。"
+
+JUDGE_SYSTEM_PROMPT = JUDGE_RULES + '只輸出 JSON：{"ok": true, "reason": ""}。' + REASON_RULE
+
+# 批次版：一次判好幾個詞 (各頻道同時送來的候選詞)，規則相同，只有輸入 / 輸出格式不同
+JUDGE_BATCH_SYSTEM_PROMPT = (
+    JUDGE_RULES.replace("使用者每次只給一串文字", "使用者會給好幾行，每行是「編號. 文字」，每一行分開判斷")
+    + '只輸出 JSON：{"verdicts": [{"id": 1, "ok": true, "reason": ""}, ...]}，每個編號都要有一筆。'
+    + REASON_RULE
+)
+
+SYSTEM_MESSAGE = {"role": "system", "content": JUDGE_SYSTEM_PROMPT}
+BATCH_SYSTEM_MESSAGE = {"role": "system", "content": JUDGE_BATCH_SYSTEM_PROMPT}
+
+# 送給 LLM 的額外參數：限定 JSON 輸出，理由最多 35 字，回應不需要太長
+REQUEST_OPTIONS = {"response_format": {"type": "json_object"}, "max_tokens": 120, "temperature": 0.2}
+
+
+def batch_request_options(size):
+    """ 批次判決的額外參數：回應長度跟著詞數放大 """
+    return dict(REQUEST_OPTIONS, max_tokens=40 + 80 * size)
+
+
+DEFAULT_REASON = "這詞連裁判都看不懂，換一個吧。"
+UNPARSEABLE_REASON = "裁判一時語塞，換個詞再試一次？"
+
+VERDICT_WORD = re.compile(r"(?<![A-Za-z])(YES|NO)(?![A-Za-z])")
+
+
+def build_judge_messages(word):
+    """ 固定的 system message + 只有詞本身的 user turn """
+    return [SYSTEM_MESSAGE, {"role": "user", "content": word}]
+
+
+def parse_verdict(text):
+    """ 解析裁判回應，回傳 (是否通過, 理由)；完全看不懂回傳 None """
+    text = (text or "").strip()
+
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get("ok"), bool):
+            if data["ok"]:
+                return True, ""
+            return False, str(data.get("reason") or "").strip()
+
+    # 模型沒照 JSON 回 (或是舊格式)：找第一個 YES / NO，前面多講什麼都不影響
+    match = VERDICT_WORD.search(text)
+    if match is None:
+        return None
+    if match.group(1) == "YES":
+        return True, ""
+    return False, text[match.end():].strip().lstrip(",，:：。.!！ ").strip()
+
+
+def is_confident_verdict(text):
+    """ 小模型的回應合不合格：通過，或是拒絕且有酸人的理由；看不懂 / 光禿禿一個拒絕就升級大模型重問 """
+    verdict = parse_verdict(text)
+    return verdict is not None and (verdict[0] or bool(verdict[1]))
+
+
+# ================= 批次判決 =================
+def build_batch_messages(words):
+    """ 固定的批次 system message + 一行一個「編號. 詞」 """
+    lines = "\n".join(f"{i}. {word}" for i, word in enumerate(words, 1))
+    return [BATCH_SYSTEM_MESSAGE, {"role": "user", "content": lines}]
+
+
+def parse_batch_verdicts(text, size):
+    """ 解析批次回應，回傳長度 size 的 list，每一格是 (是否通過, 理由) 或 None (這個詞沒判到) """
+    verdicts = [None] * size
+    text = (text or "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return verdicts
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return verdicts
+    items = data.get("verdicts") if isinstance(data, dict) else None
+    for item in items if isinstance(items, list) else ():
+        if not isinstance(item, dict) or not isinstance(item.get("ok"), bool):
+            continue
+        try:
+            index = int(item.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < size and verdicts[index] is None:
+            verdicts[index] = (True, "") if item["ok"] else (False, str(item.get("reason") or "").strip())
+    return verdicts
+
+
+def batch_acceptor(size):
+    """ 給模型路由用：每個詞都判到、拒絕都有理由才算合格，否則整批升級大模型 """
+    def accept(text):
+        return all(v is not None and (v[0] or bool(v[1])) for v in parse_batch_verdicts(text, size))
+    return accept
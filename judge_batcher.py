@@ -0,0 +1,78 @@
+import asyncio
+
+import metrics
+
+# ================= 接龍裁判批次 =================
+# 很多接龍頻道同時在玩時，每個候選詞各自打一次 Groq，而且每次都帶同一段規則。
+# 這裡把各頻道送來的詞先收集起來：等 window 秒或湊滿 max_batch 個就一起送一次，
+# 再把每個詞的判決交回給各自在等的訊息。
+#   - 同一批裡重複的詞只問一次
+#   - 批次回應裡沒判到的詞回傳 None，呼叫端自己改用單詞判決
+#   - window <= 0 或 max_batch <= 1 就不要建這個物件 (一詞一次)
+#   - 呼叫端只在 LLM 塞住 (排隊的請求至少一輪) 時才走批次；沒塞住時一詞一次延遲和吞吐量都比較好
+#     (見 bench/bench_judge_batch.py)
+
+
+class JudgeBatcher:
+    def __init__(self, judge_batch, window=0.005, max_batch=8):
+        self.judge_batch = judge_batch  # async judge_batch(words) -> [(是否通過, 理由) 或 None, ...]
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.words = 0
+        self._pending = {}  # word -> Future (依加入順序)
+        self._timer = None
+        self._tasks = set()
+
+    async def judge(self, word):
+        """ 排進下一批，等這個詞的判決 """
+        future = self._pending.get(word)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[word] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        # shield：其中一個等待的訊息被取消，不影響同一個詞的其他等待者
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        words = list(batch)
+        self.batches += 1
+        self.words += len(words)
+        metrics.JUDGE_BATCH_SIZE.observe(len(words))
+        try:
+            verdicts = await self.judge_batch(words)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for word, verdict in zip(words, verdicts):
+            if not batch[word].done():
+                batch[word].set_result(verdict)
+
+    @property
+    def average_batch(self):
+        return self.words / self.batches if self.batches else 0.0
+
+    def close(self):
+        """ 還沒送出的詞直接取消 """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
@@ -1,15 +1,51 @@
-from flask import Flask
-from threading import Thread
+from aiohttp import web
+import metrics
 
-app = Flask('')
+# ================= 保持在線 / 健康檢查伺服器 =================
+# 直接跑在機器人自己的事件迴圈裡 (aiohttp，discord.py 本來就有裝)：
+#   - 不另外開執行緒，由 setup_hook 啟動、關閉機器人時一起收掉
+#   - /        給外部喚醒服務用，永遠回 200，順便附上狀態
+#   - /healthz Gateway 斷線時回 503，讓平台的健康檢查知道要重啟
+#   - /metrics Prometheus 文字格式的監控指標
 
-@app.route('/')
-def home():
-    return "I'm alive!"
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
+class HealthServer:
+    def __init__(self, health=None, host="0.0.0.0", port=8080):
+        self.health = health  # 回傳 (是否健康, 細節 dict) 的函式
+        self.host = host
+        self.port = port
+        self._runner = None
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
+    def _status(self):
+        if self.health is None:
+            return False, {"status": "starting"}
+        ok, detail = self.health()
+        return ok, dict(detail, status="ok" if ok else "down")
+
+    async def home(self, request):
+        return web.json_response(self._status()[1])
+
+    async def healthz(self, request):
+        ok, detail = self._status()
+        return web.json_response(detail, status=200 if ok else 503)
+
+    async def metrics(self, request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.healthz)
+        app.router.add_get("/metrics", self.metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"🌐 健康檢查伺服器已啟動：http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
@@ -0,0 +1,94 @@
+import mmap
+import os
+import re
+import sys
+
+from verdict_cache import normalize_word
+
+# ================= 本機詞庫 (接龍裁判第一關) =================
+# 詞庫檔是「排序好、一行一個詞」的 UTF-8 純文字，用 mmap 開啟後直接二分搜尋，
+# 不會整包讀進記憶體。UTF-8 的位元組順序跟字元順序一致，所以可以直接比 bytes。
+#   classify() -> True  : 詞庫裡有，直接 ✅ (先查詞庫，「哈哈哈大笑」這種詞庫有的詞不會被當成亂打)
+#              -> False : 明顯亂打，直接 ❌：同一個字連打三次以上的段落有兩段以上 (「大大大吃吃吃」)，
+#                         或整個詞都是這種段落 (「啊啊啊啊」)；數字不算 (「2000年」)
+#              -> None  : 判斷不了，交給 LLM
+#
+# 建立詞庫：python lexicon.py build 原始詞表.txt data/lexicon.txt
+
+REPEATED_RUN = re.compile(r"(\D)\1{2,}")               # 同一個非數字的字連打三次以上
+ALL_REPEATED_RUNS = re.compile(r"(?:(\D)\1{2,})+")
+
+
+def is_gibberish(word):
+    """ 「大大大吃吃吃」、「啊啊啊啊」算亂打；只有一段連打 (「哈哈哈大笑」) 交給 LLM 判 """
+    runs = sum(1 for _ in REPEATED_RUN.finditer(word))
+    return runs >= 2 or (runs == 1 and ALL_REPEATED_RUNS.fullmatch(word) is not None)
+
+
+class Lexicon:
+    def __init__(self, path=None):
+        self.path = path
+        self._file = None
+        self._mm = None
+        if path and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def loaded(self):
+        return self._mm is not None
+
+    def __contains__(self, word):
+        if self._mm is None:
+            return False
+        mm = self._mm
+        target = normalize_word(word).encode("utf-8")
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", lo, mid)
+            start = lo if start < 0 else start + 1
+            end = mm.find(b"\n", start, hi)
+            if end < 0:
+                end = hi
+            line = mm[start:end]
+            if line == target:
+                return True
+            if line < target:
+                lo = end + 1
+            else:
+                hi = start
+        return False
+
+    def classify(self, word):
+        if word in self:
+            return True
+        if is_gibberish(normalize_word(word)):
+            return False
+        return None
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+
+def build_lexicon(src, dst):
+    """ 把任意詞表 (一行一個詞) 正規化、去重、排序後寫成詞庫檔 """
+    with open(src, encoding="utf-8") as f:
+        words = {normalize_word(line) for line in f}
+    words.discard("")
+    ordered = sorted(w.encode("utf-8") for w in words)
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    with open(dst, "wb") as f:
+        f.write(b"\n".join(ordered))
+    return len(ordered)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("用法：python lexicon.py build 原始詞表.txt 輸出詞庫.txt")
+        sys.exit(1)
+    count = build_lexicon(sys.argv[2], sys.argv[3])
+    print(f"✅ 已寫入 {count} 個詞到 {sys.argv[3]}")
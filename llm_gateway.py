@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from groq import Groq, APITimeoutError
+
+# ================= 非阻塞 LLM 閘道 =================
+# Groq 官方 SDK 是同步的，直接在 on_message 裡呼叫會卡住整個事件迴圈
+# (心跳、按鈕、其他頻道全部停擺)。所有 LLM 呼叫都統一走這裡：
+#   1. 真正的 HTTP 呼叫只在專用的執行緒池裡跑，永遠不會碰到事件迴圈執行緒
+#   2. 用 Semaphore 限制同時進行中的請求數量
+#   3. 每一次呼叫都有自己的逾時
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+class LLMTimeout(TimeoutError):
+    """ LLM 在指定秒數內沒有回應 """
+
+
+class LLMGateway:
+    def __init__(self, api_key=None, max_in_flight=8, timeout=30.0, base_url=None, max_retries=2):
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.client = Groq(api_key=api_key, base_url=base_url, max_retries=max_retries)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-gateway")
+        self.in_flight = 0
+        self.waiting = 0  # 在排隊等 slot 的請求數 (裁判批次用來判斷 LLM 是不是真的塞住了)
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def complete(self, messages, model=DEFAULT_MODEL, temperature=0.7, timeout=None, **kwargs):
+        """ 送出一次 chat completion，回傳 Groq 的原始回應物件 """
+        timeout = timeout or self.timeout
+        call = functools.partial(
+            self.client.chat.completions.create,
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            timeout=timeout,
+            **kwargs,
+        )
+
+        async with self._slot():
+            try:
+                loop = asyncio.get_running_loop()
+                return await asyncio.wait_for(loop.run_in_executor(self._executor, call), timeout)
+            except (asyncio.TimeoutError, APITimeoutError):
+                raise LLMTimeout(f"LLM 超過 {timeout:g} 秒沒有回應") from None
+
+    async def stream(self, messages, model=DEFAULT_MODEL, temperature=0.7, timeout=None, **kwargs):
+        """ 串流版：逐段 yield 文字。timeout 是「兩段文字之間」最多等幾秒 """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def pump():
+            # 在執行緒池裡跑同步的串流，把每一段丟回事件迴圈
+            try:
+                response = self.client.chat.completions.create(
+                    messages=messages, model=model, temperature=temperature,
+                    timeout=timeout, stream=True, **kwargs,
+                )
+                with response:
+                    for chunk in response:
+                        if stop.is_set():
+                            break
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            loop.call_soon_threadsafe(queue.put_nowait, delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        async with self._slot():
+            loop.run_in_executor(self._executor, pump)
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        raise LLMTimeout(f"LLM 超過 {timeout:g} 秒沒有新的回應") from None
+                    if item is finished:
+                        return
+                    if isinstance(item, APITimeoutError):
+                        raise LLMTimeout(f"LLM 超過 {timeout:g} 秒沒有回應") from item
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+
+    def close(self):
+        """ 關閉執行緒池 (不等待還在跑的請求) """
+        self._executor.shutdown(wait=False, cancel_futures=True)
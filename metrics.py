@@ -0,0 +1,277 @@
+import asyncio
+import bisect
+import math
+import threading
+import time
+
+# ================= 監控指標 =================
+# 最小版的 Prometheus 指標 (不另外裝 prometheus_client)：
+#   - Counter / Gauge / Histogram，都可以帶 label
+#   - render() 輸出 Prometheus 文字格式，給 keep_alive 的 /metrics 用
+#   - LoopLagSampler 定期量事件迴圈被卡住多久
+#   - instrument_http() 包住 discord.py 的 REST 呼叫，量每個路由花多久 (含限流等待)
+# 指標平常都在事件迴圈裡更新；每個指標還是有自己的鎖，執行緒池裡記錄也不會算錯
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label 值 tuple -> 數值
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _lines(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._lines())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """ 只會往上加的計數 """
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """ 目前的數值；也可以用 track() 綁一個函式，輸出時才去讀 """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._functions = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def track(self, func, **labels):
+        self._functions[self._key(labels)] = func
+
+    def value(self, **labels):
+        key = self._key(labels)
+        func = self._functions.get(key)
+        return func() if func else self._values.get(key, 0)
+
+    def _lines(self):
+        yield from super()._lines()
+        for key, func in sorted(self._functions.items()):
+            try:
+                value = func()
+            except Exception:
+                continue  # 讀不到就這次不輸出，不要讓整個 /metrics 掛掉
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """ 分桶統計 (秒數之類)，輸出 _bucket / _sum / _count """
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """ with histogram.time(site="judge"): ... 量區塊花了幾秒 """
+        return _HistogramTimer(self, labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _lines(self):
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+def render():
+    """ 所有指標的 Prometheus 文字格式 """
+    return "\n".join(metric.render() for metric in list(_registry)) + "\n"
+
+
+# ================= 常用指標 =================
+ON_MESSAGE_SECONDS = Histogram("bot_on_message_seconds", "on_message 各模式分支的處理時間", ["mode"])
+LLM_SECONDS = Histogram("bot_llm_request_seconds", "各 LLM 呼叫點的耗時", ["site"])
+LLM_ERRORS = Counter("bot_llm_errors_total", "各 LLM 呼叫點失敗次數", ["site"])
+LLM_FIRST_TOKEN_SECONDS = Histogram("bot_llm_first_token_seconds", "串流回覆的首字延遲", ["site"])
+DISCORD_REST_SECONDS = Histogram("bot_discord_rest_seconds", "Discord REST 呼叫耗時 (含限流等待)", ["method", "route"])
+DISCORD_REST_ERRORS = Counter("bot_discord_rest_errors_total", "Discord REST 呼叫失敗次數", ["method", "route", "status"])
+OUTBOUND_WAIT_SECONDS = Histogram("bot_outbound_wait_seconds", "排程器裡排隊等待的時間", ["route"])
+LOOP_LAG_SECONDS = Histogram("bot_event_loop_lag_seconds", "事件迴圈延遲 (排定時間到實際執行)",
+                             buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_LAG_MAX = Gauge("bot_event_loop_lag_max_seconds", "最近一個取樣週期內最大的事件迴圈延遲")
+VERDICT_CACHE_HIT_RATIO = Gauge("bot_verdict_cache_hit_ratio", "接龍裁判快取命中率")
+VERDICT_CACHE_ENTRIES = Gauge("bot_verdict_cache_entries", "接龍裁判快取筆數")
+GAME_QUEUE_DEPTH = Gauge("bot_game_queue_depth", "接龍佇列排隊中的詞")
+ACCEPTED_INDEX_ENTRIES = Gauge("bot_accepted_index_entries", "通過詞索引 (抓包編輯 / 刪除) 的筆數")
+LLM_IN_FLIGHT = Gauge("bot_llm_in_flight", "進行中的 LLM 請求")
+CHAT_MEMORY_CHANNELS = Gauge("bot_chat_memory_channels", "有對話記憶的頻道數")
+AI_CACHE_HIT_RATIO = Gauge("bot_ai_cache_hit_ratio", "AI 聊天回應快取命中率 (含併進同一個請求的)")
+AI_CACHE_TOKENS_SAVED = Gauge("bot_ai_cache_tokens_saved", "AI 聊天回應快取省下的 token")
+LLM_MODEL_SECONDS = Histogram("bot_llm_model_seconds", "各任務 / 模型的 LLM 呼叫耗時", ["task", "model"])
+LLM_TOKENS = Counter("bot_llm_tokens_total", "各任務 / 模型用掉的 token", ["task", "model", "kind"])
+LLM_FALLBACKS = Counter("bot_llm_fallbacks_total", "逾時 / 限流改用備用模型的次數", ["task", "reason"])
+JUDGE_BATCH_SIZE = Histogram("bot_judge_batch_size", "每次送給裁判的詞數", buckets=(1, 2, 4, 8, 16, 32, 64))
+LLM_ESCALATIONS = Counter("bot_llm_escalations_total", "回應不合格升級到大模型的次數", ["task"])
+LLM_SHED = Counter("bot_llm_shed_total", "過載保護擋下的 LLM 工作", ["task", "reason"])
+LLM_LOAD = Gauge("bot_llm_load", "LLM 後端負載 (1 = 滿)")
+LLM_BREAKER_OPEN = Gauge("bot_llm_breaker_open", "LLM 斷路器是否打開 (1 = 打開 / 半開)")
+
+
+class _LLMCall:
+    """ async with llm_call("judge"): ... 量耗時，例外就記一次失敗 """
+    __slots__ = ("site", "start")
+
+    def __init__(self, site):
+        self.site = site
+
+    async def __aenter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        LLM_SECONDS.observe(time.perf_counter() - self.start, site=self.site)
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            LLM_ERRORS.inc(site=self.site)
+        return False
+
+
+def llm_call(site):
+    return _LLMCall(site)
+
+
+# ================= 事件迴圈延遲取樣 =================
+class LoopLagSampler:
+    """ 每 interval 秒排一次 sleep，實際醒來的時間比預定晚多少就是迴圈被卡住的時間 """
+
+    def __init__(self, interval=0.5, report_every=30.0):
+        self.interval = interval
+        self.report_every = report_every
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        worst = 0.0
+        window_start = loop.time()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            LOOP_LAG_SECONDS.observe(lag)
+            worst = max(worst, lag)
+            if loop.time() - window_start >= self.report_every:
+                LOOP_LAG_MAX.set(worst)
+                worst = 0.0
+                window_start = loop.time()
+            elif worst > LOOP_LAG_MAX.value():
+                LOOP_LAG_MAX.set(worst)
+
+
+# ================= Discord REST 計時 =================
+def instrument_http(http):
+    """ 包住 discord.py 的 HTTPClient.request：每個 REST 呼叫依路由樣板記錄耗時與失敗 """
+    original = http.request
+    if getattr(original, "_instrumented", False):
+        return
+
+    async def request(route, **kwargs):
+        method = route.method
+        path = getattr(route, "path", "?")
+        start = time.perf_counter()
+        try:
+            return await original(route, **kwargs)
+        except Exception as e:
+            DISCORD_REST_ERRORS.inc(method=method, route=path, status=getattr(e, "status", type(e).__name__))
+            raise
+        finally:
+            DISCORD_REST_SECONDS.observe(time.perf_counter() - start, method=method, route=path)
+
+    request._instrumented = True
+    http.request = request
@@ -0,0 +1,181 @@
+import os
+import time
+
+import metrics
+from story_chunking import estimate_tokens
+
+# ================= 模型路由 =================
+# 每種任務 (裁判 / 聊天 / 每日故事 / 測試故事 / 記憶摘要) 各自設定用哪個模型：
+#   - 裁判這種 YES/NO 的分類工作先丟小模型，回應不合格 (格式不對 / 信心不足) 才升級到大模型
+#   - 逾時、被 429 限流或 503 滿載，就改用備用模型再試一次
+#   - 每個 (任務, 模型) 記錄延遲與 token 用量，方便之後調整
+# 預設值可以用 MODEL_<任務> / MODEL_<任務>_FALLBACK / MODEL_<任務>_ESCALATE 環境變數覆寫
+
+JUDGE = "judge"
+CHAT = "chat"
+STORY = "story"
+TEST_STORY = "test_story"
+SUMMARY = "summary"
+
+# 回應是哪一條路線給的 (complete_with_route 回傳)
+PRIMARY = "primary"
+FALLBACK = "fallback"
+ESCALATED = "escalated"
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+
+
+class Route:
+    __slots__ = ("model", "fallback", "escalate")
+
+    def __init__(self, model, fallback=None, escalate=None):
+        self.model = model        # 平常用的模型
+        self.fallback = fallback  # 逾時 / 429 時改用
+        self.escalate = escalate  # 回應不合格時升級用
+
+    def __repr__(self):
+        return f"Route({self.model!r}, fallback={self.fallback!r}, escalate={self.escalate!r})"
+
+
+DEFAULT_ROUTES = {
+    JUDGE: Route(SMALL_MODEL, fallback=LARGE_MODEL, escalate=LARGE_MODEL),
+    CHAT: Route(LARGE_MODEL, fallback=SMALL_MODEL),
+    STORY: Route(LARGE_MODEL, fallback=SMALL_MODEL),
+    TEST_STORY: Route(LARGE_MODEL, fallback=SMALL_MODEL),
+    SUMMARY: Route(SMALL_MODEL, fallback=LARGE_MODEL),
+}
+
+
+def routes_from_env(environ=os.environ):
+    """ 預設路由 + 環境變數覆寫 (設成空字串代表不要備用 / 不要升級) """
+    routes = {}
+    for task, route in DEFAULT_ROUTES.items():
+        prefix = f"MODEL_{task.upper()}"
+        routes[task] = Route(
+            environ.get(prefix, route.model),
+            fallback=environ.get(f"{prefix}_FALLBACK", route.fallback) or None,
+            escalate=environ.get(f"{prefix}_ESCALATE", route.escalate) or None,
+        )
+    return routes
+
+
+def fallback_reason(error):
+    """ 值得換模型重試的錯誤回傳原因，其他錯誤回傳 None """
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    status = getattr(error, "status_code", None)
+    if status in (429, 503):
+        return str(status)
+    return None
+
+
+def completion_text(completion):
+    return completion.choices[0].message.content or ""
+
+
+class ModelStats:
+    __slots__ = ("calls", "total_seconds", "max_seconds", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, seconds, prompt_tokens, completion_tokens):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    @property
+    def avg_seconds(self):
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class ModelRouter:
+    def __init__(self, llm, routes=None):
+        self.llm = llm
+        self.routes = dict(DEFAULT_ROUTES, **(routes or {}))
+        self.stats = {}  # (task, model) -> ModelStats
+        self.fallbacks = 0
+        self.escalations = 0
+
+    def _record(self, task, model, seconds, prompt_tokens, completion_tokens):
+        self.stats.setdefault((task, model), ModelStats()).add(seconds, prompt_tokens, completion_tokens)
+        metrics.LLM_MODEL_SECONDS.observe(seconds, task=task, model=model)
+        metrics.LLM_TOKENS.inc(prompt_tokens, task=task, model=model, kind="prompt")
+        metrics.LLM_TOKENS.inc(completion_tokens, task=task, model=model, kind="completion")
+
+    async def _call(self, task, model, messages, **kwargs):
+        start = time.perf_counter()
+        completion = await self.llm.complete(messages, model=model, **kwargs)
+        usage = getattr(completion, "usage", None)
+        self._record(task, model, time.perf_counter() - start,
+                     getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0)
+        return completion
+
+    def _fall_back(self, task, route, error):
+        reason = fallback_reason(error)
+        if reason is None or not route.fallback:
+            return False
+        print(f"⚠️ [{task}] {route.model} {reason}，改用 {route.fallback}")
+        self.fallbacks += 1
+        metrics.LLM_FALLBACKS.inc(task=task, reason=reason)
+        return True
+
+    async def complete(self, task, messages, accept=None, **kwargs):
+        """ 依任務選模型送出 chat completion；accept(text) 回傳 False 代表回應不合格，會升級到 escalate 模型重問 """
+        completion, _ = await self.complete_with_route(task, messages, accept=accept, **kwargs)
+        return completion
+
+    async def complete_with_route(self, task, messages, accept=None, **kwargs):
+        """ 跟 complete 一樣，另外回傳是哪條路線回答的 (PRIMARY / FALLBACK / ESCALATED)，
+            不用去比對 completion.model (供應商回傳的名字可能是別名或帶版本號) """
+        route = self.routes[task]
+        model = route.model
+        answered_by = PRIMARY
+        try:
+            completion = await self._call(task, model, messages, **kwargs)
+        except Exception as e:
+            if not self._fall_back(task, route, e):
+                raise
+            model = route.fallback
+            answered_by = FALLBACK
+            completion = await self._call(task, model, messages, **kwargs)
+
+        if accept is not None and route.escalate and model != route.escalate and not accept(completion_text(completion)):
+            self.escalations += 1
+            metrics.LLM_ESCALATIONS.inc(task=task)
+            completion = await self._call(task, route.escalate, messages, **kwargs)
+            answered_by = ESCALATED
+        return completion, answered_by
+
+    async def stream(self, task, messages, **kwargs):
+        """ 串流版：還沒收到任何文字前逾時 / 429 才換備用模型 (已經送出去的字收不回來) """
+        route = self.routes[task]
+        model = route.model
+        while True:
+            start = time.perf_counter()
+            parts = []
+            try:
+                async for delta in self.llm.stream(messages, model=model, **kwargs):
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                if parts or model == route.fallback or not self._fall_back(task, route, e):
+                    raise
+                model = route.fallback
+                continue
+            # 串流拿不到 usage，用本機估算
+            prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+            self._record(task, model, time.perf_counter() - start, prompt_tokens, estimate_tokens("".join(parts)))
+            return
+
+    def report(self):
+        """ {(任務, 模型): (次數, 平均秒數, 最久秒數, prompt tokens, completion tokens)} """
+        return {key: (s.calls, s.avg_seconds, s.max_seconds, s.prompt_tokens, s.completion_tokens)
+                for key, s in self.stats.items()}
@@ -0,0 +1,219 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+import metrics
+
+# ================= 對外 Discord 動作排程 =================
+# 所有「可以晚一點送」的 REST 呼叫 (反應、罵人訊息、刪除按鈕、客服單訊息...) 都排到這裡：
+#   - 每個路由 + 頻道是一個 bucket，用 token bucket 估算 Discord 的限流額度，
+#     同一個 bucket 一次只跑一個、照順序送，不會自己撞 429
+#   - 全域依優先順序挑下一個要跑的 bucket：互動回覆 > 一般訊息 > 表情反應 > 清理
+#   - 同一個頻道短時間內的多則罵人訊息合併成一則
+#   - 記錄每個路由排隊等了多久 (也會輸出到 /metrics)
+
+INTERACTION = 0
+MESSAGE = 1
+REACTION = 2
+CLEANUP = 3
+
+# 路由 -> (次數, 每幾秒)，大約是 Discord 公開的每頻道限制
+ROUTE_LIMITS = {
+    "interaction": (5, 2.0),
+    "send": (5, 5.0),
+    "edit": (5, 5.0),
+    "reaction": (1, 0.25),
+    "delete": (5, 1.0),
+    "channel": (2, 10.0),
+}
+DEFAULT_LIMIT = (5, 5.0)
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "factory", "future", "enqueued")
+
+    def __init__(self, priority, seq, factory, future):
+        self.priority = priority
+        self.seq = seq
+        self.factory = factory
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Bucket:
+    __slots__ = ("route", "key", "capacity", "rate", "tokens", "updated", "pending", "busy", "waiting")
+
+    def __init__(self, route, key, limit, per):
+        self.route = route
+        self.key = key
+        self.capacity = limit
+        self.rate = limit / per
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.pending = []     # heap of _Job
+        self.busy = False     # 同一個 bucket 一次只跑一個
+        self.waiting = False  # 正在等額度恢復
+
+    def take(self):
+        """ 有額度就扣一個回傳 0，沒有就回傳還要等幾秒 """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def idle(self):
+        return not self.pending and not self.busy and not self.waiting and self.tokens >= self.capacity - 1e-9
+
+
+class RouteStats:
+    __slots__ = ("count", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add(self, wait):
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def avg_wait(self):
+        return self.total_wait / self.count if self.count else 0.0
+
+
+class OutboundScheduler:
+    def __init__(self, workers=4, merge_window=0.5, limits=None):
+        self.worker_count = workers
+        self.merge_window = merge_window
+        self.limits = dict(ROUTE_LIMITS, **(limits or {}))
+        self.stats = {}     # route -> RouteStats
+        self._buckets = {}  # (route, key) -> _Bucket
+        self._ready = None  # PriorityQueue of (priority, seq, bucket_key)
+        self._workers = []
+        self._seq = itertools.count()
+        self._merging = {}  # channel_id -> (texts, future)
+
+    # --- 排程核心 ---
+    def _ensure_workers(self):
+        if self._ready is None:
+            self._ready = asyncio.PriorityQueue()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    def submit(self, priority, route, key, factory):
+        """ factory 是「呼叫後回傳 coroutine」的函式，回傳一個可以 await 的 future """
+        self._ensure_workers()
+        bucket_key = (route, key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            if len(self._buckets) > 10000:
+                self._prune()
+            bucket = self._buckets[bucket_key] = _Bucket(route, key, *self.limits.get(route, DEFAULT_LIMIT))
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_log_failure)
+        job = _Job(priority, next(self._seq), factory, future)
+        heapq.heappush(bucket.pending, job)
+        self._schedule(bucket)
+        return future
+
+    def _schedule(self, bucket):
+        if bucket.pending and not bucket.busy and not bucket.waiting:
+            top = bucket.pending[0]
+            self._ready.put_nowait((top.priority, top.seq, (bucket.route, bucket.key)))
+
+    def _wake(self, bucket):
+        bucket.waiting = False
+        self._schedule(bucket)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, bucket_key = await self._ready.get()
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None or bucket.busy or bucket.waiting or not bucket.pending:
+                continue  # 重複或過期的排程項目
+
+            delay = bucket.take()
+            if delay > 0:
+                bucket.waiting = True
+                loop.call_later(delay, self._wake, bucket)
+                continue
+
+            job = heapq.heappop(bucket.pending)
+            bucket.busy = True
+            waited = time.monotonic() - job.enqueued
+            self.stats.setdefault(bucket.route, RouteStats()).add(waited)
+            metrics.OUTBOUND_WAIT_SECONDS.observe(waited, route=bucket.route)
+            try:
+                result = await job.factory()
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                bucket.busy = False
+                self._schedule(bucket)
+
+    def _prune(self):
+        for bucket_key in [k for k, b in self._buckets.items() if b.idle()]:
+            del self._buckets[bucket_key]
+
+    # --- 常用動作 ---
+    def send(self, channel, priority=MESSAGE, **kwargs):
+        return self.submit(priority, "send", channel.id, lambda: channel.send(**kwargs))
+
+    def react(self, message, emoji, priority=REACTION):
+        return self.submit(priority, "reaction", message.channel.id, lambda: message.add_reaction(emoji))
+
+    def followup(self, interaction, priority=INTERACTION, **kwargs):
+        return self.submit(priority, "interaction", interaction.id, lambda: interaction.followup.send(**kwargs))
+
+    def rebuke(self, channel, text):
+        """ 罵人訊息：merge_window 秒內同一個頻道的多則合併成一則送出 """
+        pending = self._merging.get(channel.id)
+        if pending is not None:
+            texts, future = pending
+            if text not in texts:
+                texts.append(text)
+            return future
+
+        texts = [text]
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_log_failure)
+        self._merging[channel.id] = (texts, future)
+
+        def flush():
+            del self._merging[channel.id]
+            inner = self.send(channel, content="\n".join(texts)[:2000])
+            inner.add_done_callback(lambda f: _chain(f, future))
+
+        asyncio.get_running_loop().call_later(self.merge_window, flush)
+        return future
+
+    def report(self):
+        """ 每個路由的排隊等待：{route: (次數, 平均秒數, 最久秒數)} """
+        return {route: (s.count, s.avg_wait, s.max_wait) for route, s in self.stats.items()}
+
+
+def _chain(source, target):
+    if target.done():
+        return
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️ Discord 動作失敗：{future.exception()}")
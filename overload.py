@@ -0,0 +1,274 @@
+import asyncio
+import contextlib
+import time
+
+import metrics
+import model_router
+
+# ================= LLM 過載保護 =================
+# Groq 變慢或一直 429 的時候，與其每則訊息都打過去、每則都回一句錯誤，不如在前面擋一層：
+#   - 追蹤進行中的請求數、最近的延遲 (相對於各任務的目標延遲) 和錯誤率 (EWMA)，全域 + 每個伺服器各一份
+#   - 負載 = max(進行中 / 容量, 延遲比, 錯誤率 / 門檻)；超過各任務的門檻就不做 (丟出 Overloaded)：
+#       測試故事 0.5 -> 記憶摘要 0.6 -> AI 聊天 0.75 -> 每日故事 0.9 (延後到有空再做) -> 接龍裁判 1.0
+#   - 有別的伺服器在用時，單一伺服器最多只能佔容量的 guild_share，不會一個伺服器洗版把別人擠掉
+#   - 斷路器：連續失敗太多次 (或樣本夠多時錯誤率太高) 就整個打開，cooldown 秒內完全不打 Groq，
+#     之後只放一個請求試水溫，成功就恢復，失敗就再關更久
+#   - 只有透過 slot 給的 call.run() / call.stream() 呼叫 LLM 時的錯誤才算後端失敗；
+#     同一個 async with 裡 Discord 的 403 / 429 之類的錯不算，不會因為一個頻道權限設錯就關掉所有伺服器的裁判
+#   - 同一個頻道的「忙線中」通知每 notice_interval 秒最多一則
+
+# 負載超過多少就不做這種工作 (越小越先被犧牲)
+SHED_AT = {
+    model_router.TEST_STORY: 0.5,
+    model_router.SUMMARY: 0.6,
+    model_router.CHAT: 0.75,
+    model_router.STORY: 0.9,
+    model_router.JUDGE: 1.0,
+}
+
+# 各任務「正常」的延遲 (秒)，延遲比 = 實際 / 目標
+LATENCY_TARGET = {
+    model_router.JUDGE: 2.0,
+    model_router.CHAT: 10.0,
+    model_router.SUMMARY: 10.0,
+    model_router.STORY: 60.0,
+    model_router.TEST_STORY: 30.0,
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Overloaded(Exception):
+    """ 過載保護擋下的請求 (reason: breaker / busy / guild) """
+
+    def __init__(self, task, reason):
+        super().__init__(f"{task} 被過載保護擋下 ({reason})")
+        self.task = task
+        self.reason = reason
+
+
+class LoadStats:
+    """ 進行中的請求數 + 延遲比 / 錯誤率的 EWMA """
+    __slots__ = ("in_flight", "latency", "errors", "samples", "shed", "updated")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency = 0.0  # 延遲比的 EWMA
+        self.errors = 0.0   # 錯誤率的 EWMA
+        self.samples = 0    # 錯誤率算進了幾個結果 (太少的時候錯誤率不準，不拿來開斷路器)
+        self.shed = 0
+        self.updated = time.monotonic()
+
+    def decay(self, half_life):
+        """ 沒有新的結果進來時慢慢歸零，不然全部被擋下之後負載永遠降不下來 """
+        now = time.monotonic()
+        factor = 0.5 ** ((now - self.updated) / half_life)
+        self.latency *= factor
+        self.errors *= factor
+        self.updated = now
+
+    def record(self, latency_ratio, failed, alpha, half_life):
+        self.decay(half_life)
+        self.latency += alpha * (latency_ratio - self.latency)
+        self.errors += alpha * ((1.0 if failed else 0.0) - self.errors)
+        self.samples += 1
+
+
+class LLMCall:
+    """ slot() 給的把手：LLM 呼叫要透過 run() / stream()，只有這裡面的錯誤和耗時才算進後端的負載 """
+    __slots__ = ("called", "failed", "seconds")
+
+    def __init__(self):
+        self.called = False
+        self.failed = False
+        self.seconds = 0.0
+
+    async def run(self, awaitable):
+        """ result = await call.run(router.complete(...)) """
+        self.called = True
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            self.failed = True
+            raise
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    async def stream(self, chunks):
+        """ 包住 router.stream(...)：只算等 LLM 吐字的時間，呼叫端 (編輯 Discord 訊息) 的時間和錯誤不算 """
+        self.called = True
+        iterator = chunks.__aiter__()
+        while True:
+            start = time.perf_counter()
+            try:
+                delta = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception:
+                self.failed = True
+                raise
+            finally:
+                self.seconds += time.perf_counter() - start
+            yield delta
+
+
+class OverloadController:
+    def __init__(self, capacity=64, guild_share=0.5, error_threshold=0.5, alpha=0.2, half_life=10.0,
+                 min_samples=10, breaker_failures=5, breaker_cooldown=30.0, max_cooldown=300.0, notice_interval=60.0):
+        self.capacity = capacity
+        self.guild_share = guild_share
+        self.error_threshold = error_threshold
+        self.alpha = alpha
+        self.half_life = half_life
+        self.min_samples = min_samples
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.max_cooldown = max_cooldown
+        self.notice_interval = notice_interval
+        self.total = LoadStats()
+        self.guilds = {}           # guild_id -> LoadStats
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._cooldown = breaker_cooldown
+        self._open_until = 0.0
+        self._probing = False
+        self._notices = {}         # channel_id -> 上次通知的時間
+
+    # --- 負載 ---
+    def load(self, stats=None):
+        """ 0 = 閒、1 = 滿；伺服器的負載 = 全域的進行中比例 + 這個伺服器自己的延遲 / 錯誤 """
+        stats = stats or self.total
+        stats.decay(self.half_life)
+        errors = stats.errors / self.error_threshold if stats.samples >= self.min_samples else 0.0
+        return max(self.total.in_flight / self.capacity, stats.latency, errors)
+
+    def _guild(self, guild_id):
+        if guild_id is None:
+            return None
+        stats = self.guilds.get(guild_id)
+        if stats is None:
+            stats = self.guilds[guild_id] = LoadStats()
+        return stats
+
+    def check(self, guild_id, task, probe=True):
+        """ 這個工作現在可以做嗎？不行就丟出 Overloaded。
+            斷路器冷卻完之後，第一個 probe=True 的請求拿去試水溫 (回傳 True)；
+            probe=False 只是事先檢查 (例如排進裁判批次前)，不會佔掉試水溫的名額 """
+        try:
+            return self._admit(guild_id, task, probe)
+        except Overloaded as e:
+            self._count_shed(guild_id, e)
+            raise
+
+    def _admit(self, guild_id, task, probe):
+        if self.state != CLOSED:
+            if self._probing or (self.state == OPEN and time.monotonic() < self._open_until):
+                raise Overloaded(task, "breaker")
+            if not probe:
+                return False
+            self.state = HALF_OPEN
+            self._probing = True
+            return True
+
+        guild = self._guild(guild_id)
+        load = self.load() if guild is None else max(self.load(), self.load(guild))
+        if load >= SHED_AT[task]:
+            raise Overloaded(task, "busy")
+        # 只有別的伺服器也在用的時候才限制單一伺服器的份額 (只有一個伺服器在用就讓它用滿)
+        if (guild is not None and guild.in_flight >= max(1, self.capacity * self.guild_share)
+                and self.total.in_flight > guild.in_flight):
+            raise Overloaded(task, "guild")
+        return False
+
+    def _count_shed(self, guild_id, error):
+        self.total.shed += 1
+        guild = self._guild(guild_id)
+        if guild is not None:
+            guild.shed += 1
+        metrics.LLM_SHED.inc(task=error.task, reason=error.reason)
+
+    # --- 斷路器 ---
+    def _on_result(self, failed, probe):
+        if probe:
+            self._probing = False
+        if not failed:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                print("✅ LLM 恢復正常，斷路器關閉")
+                self.state = CLOSED
+                self._cooldown = self.breaker_cooldown
+                self.total.errors = 0.0
+                self.total.samples = 0
+            return
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+            self._trip()
+        elif self.state == CLOSED and (self.consecutive_failures >= self.breaker_failures
+                                       or (self.total.samples >= self.min_samples
+                                           and self.total.errors >= self.error_threshold)):
+            self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self._open_until = time.monotonic() + self._cooldown
+        print(f"🔌 LLM 連續失敗 {self.consecutive_failures} 次，斷路器打開 {self._cooldown:g} 秒")
+
+    # --- 包住一次 LLM 工作 ---
+    @contextlib.asynccontextmanager
+    async def slot(self, guild_id, task, wait=0.0, poll=1.0):
+        """ async with overload.slot(伺服器ID, 任務) as call：擋下就丟 Overloaded；
+            裡面用 call.run() / call.stream() 呼叫 LLM，沒有透過 call 的錯誤 (Discord 之類的) 不算後端失敗。
+            wait > 0 代表這件工作可以延後，最多等 wait 秒有空再做 (每日故事用) """
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                probe = self._admit(guild_id, task, probe=True)
+                break
+            except Overloaded as e:
+                if time.monotonic() + poll > deadline:
+                    self._count_shed(guild_id, e)
+                    raise
+                await asyncio.sleep(poll)
+
+        guild = self._guild(guild_id)
+        targets = [stats for stats in (self.total, guild) if stats is not None]
+        for stats in targets:
+            stats.in_flight += 1
+        call = LLMCall()
+        cancelled = False
+        try:
+            yield call
+        except asyncio.CancelledError:
+            cancelled = True  # 被取消不算後端的錯
+            raise
+        finally:
+            for stats in targets:
+                stats.in_flight -= 1
+            if cancelled or not call.called:
+                # 沒有結果 (被取消、LLM 還沒呼叫就出錯)：不記錄，試水溫的名額還回去
+                if probe:
+                    self._probing = False
+            else:
+                ratio = call.seconds / LATENCY_TARGET[task]
+                for stats in targets:
+                    stats.record(ratio, call.failed, self.alpha, self.half_life)
+                self._on_result(call.failed, probe)
+
+    # --- 通知節流 ---
+    def should_notify(self, channel_id):
+        """ 同一個頻道每 notice_interval 秒最多通知一次 """
+        now = time.monotonic()
+        if now - self._notices.get(channel_id, float("-inf")) < self.notice_interval:
+            return False
+        self._notices[channel_id] = now
+        if len(self._notices) > 10000:
+            self._notices = {cid: t for cid, t in self._notices.items() if now - t < self.notice_interval}
+        return True
+
+    def report(self):
+        """ (斷路器狀態, 全域負載, 全域統計, {伺服器ID: (負載, 統計)}) """
+        return self.state, self.load(), self.total, {gid: (self.load(s), s) for gid, s in self.guilds.items()}
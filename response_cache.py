@@ -0,0 +1,105 @@
+import asyncio
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+# ================= AI 聊天回應快取 =================
+# 不同頻道 / 不同伺服器常常問一模一樣的問題 (FAQ、跟機器人打招呼)，每次都完整跑一次大模型很浪費。
+#   - key = (模型參數, 正規化後的問題)：全形半形、大小寫、多餘空白、結尾標點都不影響
+#   - LRU + 上限筆數；每筆最多活 max_ttl 秒
+#   - 新鮮度由頻道決定：同一筆回應，A 頻道接受 1 小時內的，B 頻道只接受 5 分鐘內的
+#   - 同一個問題同時有好幾個人在問，只打一次 LLM，其他人等同一個結果 (single-flight)
+#   - fetch 可以說這次的回應不要存 (例如主模型忙線、改由備用模型回答的)，一起在等的人照樣拿到
+# 只給有用 !aicache 開啟的頻道用；開了快取的頻道回覆不帶對話記憶 (不然就不會有一樣的 prompt)。
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = "?？!！。.~～… "
+
+
+def normalize_prompt(text):
+    """ 讓「你好！」「 你好 」「你好?」算同一個問題 """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _SPACES.sub(" ", text).strip().rstrip(_TRAILING)
+
+
+class CachedReply:
+    __slots__ = ("text", "tokens", "created_at")
+
+    def __init__(self, text, tokens):
+        self.text = text
+        self.tokens = tokens  # 這次回應花掉的 token，命中一次就省一次
+        self.created_at = time.monotonic()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1000, max_ttl=86400):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0       # 同時問同一題，跟著別人的請求一起拿結果的次數
+        self.tokens_saved = 0
+        self._entries = OrderedDict()  # key -> CachedReply，越後面越近期用過
+        self._in_flight = {}           # key -> Future[CachedReply]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.collapsed + self.misses
+        return (self.hits + self.collapsed) / total if total else 0.0
+
+    def get(self, key, ttl):
+        """ 拿到 ttl 秒內的回應，沒有或太舊回傳 None (不算命中率) """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry.created_at
+        if age > self.max_ttl:
+            del self._entries[key]
+            return None
+        if age > ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, text, tokens=0):
+        entry = self._entries[key] = CachedReply(text, tokens)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def get_or_fetch(self, key, ttl, fetch):
+        """ 快取有 ttl 秒內的就直接用；沒有就呼叫 fetch() -> (文字, token 數, 要不要存)，同一個 key 同時只打一次 """
+        entry = self.get(key, ttl)
+        if entry is not None:
+            self.hits += 1
+            self.tokens_saved += entry.tokens
+            return entry.text
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            entry = await asyncio.shield(future)
+            self.collapsed += 1
+            self.tokens_saved += entry.tokens
+            return entry.text
+
+        self.misses += 1
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            text, tokens, keep = await fetch()
+            future.set_result(self.put(key, text, tokens) if keep else CachedReply(text, tokens))
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # 失敗不快取；在等的人一起收到錯誤
+            future.set_exception(e)
+            future.exception()  # 沒人在等也不要警告 "exception was never retrieved"
+            raise
+        finally:
+            del self._in_flight[key]
@@ -0,0 +1,86 @@
+import os
+import socket
+import time
+import uuid
+
+import storage
+
+# ================= 跨 shard 共用狀態 =================
+# 多個 shard 行程 (同一台機器) 要共用：頻道設定 / 接龍進度、裁判快取、每日故事進度，
+# 以及「同一件事只能有一個行程在做」的租約鎖。
+#   - SharedState 是介面：connect() 給各個 store 開資料庫連線，acquire()/release() 是租約鎖
+#   - SQLiteSharedState 是本機實作：所有行程開同一個 SQLite 檔 (WAL + busy_timeout)，
+#     租約記在 leases 表，用一個 UPSERT 原子地搶，過期的租約可以被別人接手
+# 各 shard 只會收到自己伺服器的事件，頻道設定不會被兩個行程同時改；
+# 真正需要搶的只有每日故事這種「每個行程都會排程到」的工作。
+# 搶 / 還租約是寫入，交給 storage 的寫入執行緒做 (acquire 要 await)，等別的行程的寫入鎖時不會卡住事件迴圈。
+
+
+def default_owner(scope=""):
+    """ 租約持有者名稱：每個行程都不一樣 (機器:shard:pid:隨機)。
+        重新部署時新舊行程會用同一組 SHARD_IDS 在同一台機器上重疊一段時間，名字一樣的話兩邊都搶得到租約 """
+    return f"{socket.gethostname()}:{scope or 'all'}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SharedState:
+    """ 跨行程共用狀態的介面 """
+
+    def connect(self):
+        """ 給 store 用的資料庫連線 (每個 store 各開一條) """
+        raise NotImplementedError
+
+    async def acquire(self, name, owner, ttl):
+        """ 搶租約：沒人持有、已過期、或本來就是自己的，就拿到 (回傳 True) 並續期 ttl 秒 """
+        raise NotImplementedError
+
+    def release(self, name, owner):
+        """ 還租約 (只能還自己的，不用等寫完) """
+        raise NotImplementedError
+
+    def holder(self, name):
+        """ 目前持有者，沒有或已過期回傳 None """
+        raise NotImplementedError
+
+
+class SQLiteSharedState(SharedState):
+    def __init__(self, path=None):
+        self.path = path
+        self.conn = self.connect()
+        self.writer = storage.writer_for(self.conn)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def connect(self):
+        return storage.connect(self.path)
+
+    async def acquire(self, name, owner, ttl):
+        return await self.writer.run(self._acquire, name, owner, ttl)
+
+    @staticmethod
+    def _acquire(conn, name, owner, ttl):
+        now = time.time()  # 在寫入執行緒上拿時間，排隊等鎖的時間不會吃掉租約
+        cursor = conn.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+            (name, owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, name, owner):
+        self.writer.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def holder(self, name):
+        row = self.conn.execute(
+            "SELECT owner FROM leases WHERE name = ? AND expires_at >= ?", (name, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def prune(self, older_than=7 * 86400):
+        """ 清掉過期很久的租約 """
+        self.writer.execute("DELETE FROM leases WHERE expires_at < ?", (time.time() - older_than,))
@@ -0,0 +1,155 @@
+import asyncio
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+
+# ================= 本機資料庫 =================
+# 所有需要跨重啟保存的資料 (裁判快取、頻道設定...) 都放在同一個 SQLite 檔，
+# 開 WAL 模式讓讀寫不互卡。路徑可用 BOT_DATA_DIR 環境變數調整。
+# 多個 shard 行程共用同一個檔案時，寫入撞在一起會等 busy_timeout 毫秒再放棄。
+# 所以執行中的寫入不在事件迴圈上直接 execute (等別的行程的寫入鎖時會卡住心跳和所有頻道)，
+# 改丟給 writer_for(conn) 拿到的寫入器：同一個檔案共用一條寫入執行緒 + 專用連線，
+# 排隊的寫入合併成一個 transaction；:memory: 沒有別的行程會搶鎖，直接寫。
+
+DATA_DIR = os.environ.get("BOT_DATA_DIR", "data")
+DB_FILE = "bot.db"
+BUSY_TIMEOUT_MS = int(os.environ.get("BOT_DB_BUSY_TIMEOUT_MS", "5000"))
+
+
+def connect(path=None):
+    """ 開啟 (必要時建立) 資料庫，path 傳 ":memory:" 可用於測試 """
+    if path is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        path = os.path.join(DATA_DIR, DB_FILE)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+class InlineWriter:
+    """ 直接在呼叫端寫 (:memory: 用)，介面跟 Writer 一樣 """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        self.conn.execute(sql, params)
+
+    async def run(self, func, *args):
+        return func(self.conn, *args)
+
+    def flush(self, timeout=None):
+        return True
+
+
+class Writer:
+    """ 一條寫入執行緒：execute() 丟進佇列就回傳，run() 等寫入執行緒跑完 func(conn, *args) 拿結果 """
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()  # (sql 或 func, 參數, 等結果的 (loop, future) / flush 的 Event / None)
+        self._thread = threading.Thread(target=self._worker, name=f"sqlite-writer:{path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)  # 正常結束時把還在排隊的寫完
+
+    def execute(self, sql, params=()):
+        self._queue.put((sql, params, None))
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((func, args, (loop, future)))
+        return await future
+
+    def flush(self, timeout=10.0):
+        """ 等目前排隊的寫入都做完 (關機時用)，逾時回傳 False """
+        done = threading.Event()
+        self._queue.put((None, (), done))
+        return done.wait(timeout)
+
+    def _worker(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                results = [(True, self._apply(conn, item)) for item in batch]
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                # 整批失敗就一筆一筆重做，只有真的有問題的那筆報錯
+                results = []
+                for item in batch:
+                    try:
+                        results.append((True, self._apply(conn, item)))
+                    except Exception as e:
+                        results.append((False, e))
+            for item, (ok, value) in zip(batch, results):
+                self._resolve(item, ok, value)
+
+    @staticmethod
+    def _apply(conn, item):
+        target, args, _ = item
+        if target is None:  # flush 的記號
+            return None
+        if isinstance(target, str):
+            return conn.execute(target, args).rowcount
+        return target(conn, *args)
+
+    @staticmethod
+    def _resolve(item, ok, value):
+        waiter = item[2]
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        elif waiter is None:
+            if not ok:
+                print(f"⚠️ 資料庫寫入失敗：{value}")
+        else:
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(_settle, future, ok, value)
+            except RuntimeError:
+                pass  # 事件迴圈已經關了，沒人在等
+
+
+def _settle(future, ok, value):
+    if future.cancelled():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(conn):
+    """ 給 store 用的寫入器：同一個資料庫檔案整個行程共用一個 Writer；:memory: 回傳 InlineWriter """
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not path:
+        return InlineWriter(conn)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = Writer(path)
+        return writer
+
+
+def flush_writers(timeout=10.0):
+    """ 關機時把所有寫入器排隊中的寫入做完 """
+    for writer in list(_writers.values()):
+        writer.flush(timeout)
@@ -0,0 +1,44 @@
+import math
+
+# ================= 大量詞彙分批 (map-reduce) =================
+# 詞彙太多時不要一次全部塞進 prompt：先在本機估算 token 數，
+# 切成幾批各自生成故事片段 (map)，最後再串成一篇完整故事 (reduce)。
+#
+# token 估算是保守的經驗值：中日韓文字 1 字約 1 token，其他字元約 4 個字 1 token。
+
+
+def is_cjk(char):
+    code = ord(char)
+    return (
+        0x4E00 <= code <= 0x9FFF      # 常用漢字
+        or 0x3400 <= code <= 0x4DBF   # 擴充 A
+        or 0x3000 <= code <= 0x30FF   # 中文標點、假名
+        or 0xFF00 <= code <= 0xFFEF   # 全形字元
+        or 0x20000 <= code <= 0x2FA1F # 擴充 B 之後
+    )
+
+
+def estimate_tokens(text):
+    cjk = sum(1 for char in text if is_cjk(char))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def chunk_words(words, max_tokens, separator="、"):
+    """ 依 token 預算把詞彙平均切成幾批，每批不超過 max_tokens (單一詞超過就自己一批) """
+    costs = [estimate_tokens(word) + estimate_tokens(separator) for word in words]
+    total = sum(costs)
+    if total <= max_tokens:
+        return [list(words)]
+
+    # 先決定要切幾批，再平均分配，避免最後一批只剩幾個詞
+    target = math.ceil(total / math.ceil(total / max_tokens))
+    batches, batch, used = [], [], 0
+    for word, cost in zip(words, costs):
+        if batch and (used + cost > max_tokens or used >= target):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(word)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,236 @@
+import asyncio
+import inspect
+import time
+
+import storage
+
+# ================= 每日故事流水線 =================
+# 每個接龍頻道是一個獨立的工作：撈詞 -> 生成故事 -> 發送。
+#   - 最多 workers 個頻道同時進行，一個伺服器卡住不會拖累其他伺服器
+#   - 每個階段失敗都會退避重試 (2 秒、4 秒、8 秒...)
+#   - 每個頻道做到哪一步都記在資料庫，重啟後接著做，不會重複發文也不會漏掉
+#   - 整輪跑完記錄總耗時
+#   - 多個 shard 行程時：每個行程只做自己看得到的頻道 (scope = 自己的 shard)，
+#     每個頻道做之前先搶租約，做的期間定期續約，同一個頻道同一天只會有一個行程在做；
+#     行程掛掉就不會再續約，租約過期後別的行程可以接手
+#   - 進度 / 租約的寫入都在 storage 的寫入執行緒上做 (要 await)，等別的行程的寫入鎖時不會卡住事件迴圈
+
+GENERATED = "generated"
+SENT = "sent"
+FAILED = "failed"
+CLAIMED = "claimed"  # 別的行程正在做
+
+
+async def retry(stage, func, *args, attempts=3, backoff=2.0):
+    """ 呼叫 func(*args)，失敗就等 backoff * 2^n 秒後重試，最後一次的錯誤會往外丟 """
+    for attempt in range(1, attempts + 1):
+        try:
+            result = func(*args)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            print(f"   ⚠️ [{stage}] 第 {attempt} 次失敗：{e}，{delay:g} 秒後重試")
+            await asyncio.sleep(delay)
+
+
+class StoryProgress:
+    """ 記錄每一輪 (run_date) 的狀態，以及每個頻道做到哪一步；scope 是這個行程負責的 shard """
+
+    def __init__(self, conn, scope=""):
+        self.conn = conn
+        self.writer = storage.writer_for(conn)
+        self.scope = scope
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS story_runs (
+                run_date TEXT PRIMARY KEY,
+                window_start REAL NOT NULL,
+                window_end REAL NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                duration REAL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS story_progress (
+                run_date TEXT NOT NULL,
+                channel_id INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                story TEXT,
+                word_count INTEGER,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_date, channel_id)
+            )
+        """)
+        # 每個 scope 各自記錄有沒有跑完 (時間範圍還是共用 story_runs 的)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS story_run_scopes (
+                run_date TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                duration REAL,
+                PRIMARY KEY (run_date, scope)
+            )
+        """)
+        conn.execute(
+            "INSERT OR IGNORE INTO story_run_scopes (run_date, scope, started_at, finished_at, duration) "
+            "SELECT run_date, '', started_at, finished_at, duration FROM story_runs"
+        )
+
+    async def start_run(self, run_date, window_start, window_end):
+        """ 開始 (或接續) 一輪，回傳這一輪的時間範圍 (接續時沿用第一次的範圍) """
+        return await self.writer.run(self._start_run, run_date, window_start, window_end)
+
+    def _start_run(self, conn, run_date, window_start, window_end):
+        conn.execute(
+            "INSERT OR IGNORE INTO story_runs (run_date, window_start, window_end, started_at) VALUES (?, ?, ?, ?)",
+            (run_date, window_start, window_end, time.time()),
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO story_run_scopes (run_date, scope, started_at) VALUES (?, ?, ?)",
+            (run_date, self.scope, time.time()),
+        )
+        return conn.execute(
+            "SELECT window_start, window_end FROM story_runs WHERE run_date = ?", (run_date,)
+        ).fetchone()
+
+    async def finish_run(self, run_date, duration):
+        await self.writer.run(self._finish_run, run_date, duration)
+
+    def _finish_run(self, conn, run_date, duration):
+        now = time.time()
+        conn.execute(
+            "UPDATE story_run_scopes SET finished_at = ?, duration = ? WHERE run_date = ? AND scope = ?",
+            (now, duration, run_date, self.scope),
+        )
+        conn.execute(
+            "UPDATE story_runs SET finished_at = ?, duration = ? WHERE run_date = ?",
+            (now, duration, run_date),
+        )
+
+    def unfinished_run(self):
+        """ 這個 scope 最近一輪如果沒跑完 (例如中途重啟)，回傳它的 run_date """
+        row = self.conn.execute(
+            "SELECT run_date FROM story_run_scopes WHERE scope = ? AND finished_at IS NULL "
+            "ORDER BY started_at DESC LIMIT 1",
+            (self.scope,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, run_date, channel_id):
+        """ 回傳 (stage, story, word_count)，還沒開始就是 None """
+        return self.conn.execute(
+            "SELECT stage, story, word_count FROM story_progress WHERE run_date = ? AND channel_id = ?",
+            (run_date, channel_id),
+        ).fetchone()
+
+    async def set(self, run_date, channel_id, stage, story=None, word_count=None):
+        """ 等寫進資料庫才回傳：生成完先記下來再發送，重啟後才不會重複發文 """
+        await self.writer.run(self._set, run_date, channel_id, stage, story, word_count)
+
+    @staticmethod
+    def _set(conn, run_date, channel_id, stage, story, word_count):
+        conn.execute(
+            "INSERT OR REPLACE INTO story_progress (run_date, channel_id, stage, story, word_count, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (run_date, channel_id, stage, story, word_count, time.time()),
+        )
+
+
+class StoryPipeline:
+    """
+    collect(source) -> 詞彙 list
+    generate(source, words) -> 故事文字
+    publish(source, output, story, word_count) -> 發送
+    """
+
+    def __init__(self, progress, collect, generate, publish, workers=4, attempts=3, backoff=2.0,
+                 lease=None, owner=None, lease_ttl=300):
+        self.progress = progress
+        self.collect = collect
+        self.generate = generate
+        self.publish = publish
+        self.attempts = attempts
+        self.backoff = backoff
+        self.lease = lease          # SharedState，None 代表只有一個行程，不用搶
+        self.owner = owner
+        self.lease_ttl = lease_ttl  # 租約多久沒續就當作那個行程掛了 (做的期間每 lease_ttl / 3 秒續一次)
+        self._workers = asyncio.Semaphore(workers)
+
+    async def _run_channel(self, run_date, source, output):
+        async with self._workers:
+            if self.lease is None:
+                return await self._run_stages(run_date, source, output)
+            name = f"story:{run_date}:{source.id}"
+            if not await self.lease.acquire(name, self.owner, self.lease_ttl):
+                print(f"   ⏭️ {source.name}：{self.lease.holder(name)} 正在處理，跳過")
+                return CLAIMED
+            work = asyncio.ensure_future(self._run_stages(run_date, source, output))
+            keeper = asyncio.create_task(self._keep_lease(name, source, work))
+            try:
+                return await work
+            except asyncio.CancelledError:
+                if keeper.done() and not keeper.cancelled():
+                    return CLAIMED  # 租約被別人接手，手上的工作已經取消
+                raise
+            finally:
+                keeper.cancel()
+                self.lease.release(name, self.owner)
+
+    async def _keep_lease(self, name, source, work):
+        """ 工作進行中定期續約 (生成可能因為重試 / LLM 忙線延後而超過 lease_ttl)；續不到就取消工作 """
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            if not await self.lease.acquire(name, self.owner, self.lease_ttl):
+                print(f"   ⚠️ {source.name}：租約被 {self.lease.holder(name)} 接手，停止處理")
+                work.cancel()
+                return
+
+    async def _run_stages(self, run_date, source, output):
+        state = self.progress.get(run_date, source.id)
+        if state and state[0] == SENT:
+            return "skipped"
+
+        if state and state[0] == GENERATED:
+            story, word_count = state[1], state[2]
+            print(f"   ↪️ {source.name}：沿用上次已生成的故事，直接發送")
+        else:
+            words = await retry(f"{source.name} 撈詞", self.collect, source,
+                                attempts=self.attempts, backoff=self.backoff)
+            if not words:
+                await self.progress.set(run_date, source.id, SENT, word_count=0)
+                return "empty"
+            story = await retry(f"{source.name} 生成", self.generate, source, words,
+                                attempts=self.attempts, backoff=self.backoff)
+            word_count = len(words)
+            await self.progress.set(run_date, source.id, GENERATED, story, word_count)
+
+        await retry(f"{source.name} 發送", self.publish, source, output, story, word_count,
+                    attempts=self.attempts, backoff=self.backoff)
+        await self.progress.set(run_date, source.id, SENT, word_count=word_count)
+        return "sent"
+
+    async def run(self, run_date, jobs):
+        """ jobs: [(來源接龍頻道, 故事發布頻道)]，回傳 {結果: 數量} """
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._run_channel(run_date, source, output) for source, output in jobs),
+            return_exceptions=True,
+        )
+
+        summary = {}
+        for (source, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"   ❌ {source.name} 故事生成失敗：{result}")
+                result = FAILED
+            summary[result] = summary.get(result, 0) + 1
+
+        duration = time.perf_counter() - start
+        if FAILED not in summary and CLAIMED not in summary:
+            await self.progress.finish_run(run_date, duration)
+        print(f"📜 每日故事 {run_date} 完成：{summary}，總耗時 {duration:.1f} 秒")
+        return summary
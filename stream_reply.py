@@ -0,0 +1,82 @@
+import time
+
+# ================= AI 串流回覆 =================
+# 先送一則「思考中」的訊息，之後邊收 token 邊編輯它 (有間隔限制，避免撞 Discord 的編輯頻率)。
+# 超過 Discord 單則 2000 字上限就把目前這則定稿，接著開新的一則繼續寫。
+# 串到一半出錯時，已經收到的字會留在訊息上並標記「回應中斷」，再把錯誤往外丟。
+
+DISCORD_LIMIT = 2000
+PLACEHOLDER = "🤖 思考中..."
+INTERRUPTED = "（回應中斷）"
+
+
+def split_message(text, limit=DISCORD_LIMIT):
+    """ 切出第一段 (盡量在換行處切)，回傳 (第一段, 剩下的) """
+    if len(text) <= limit:
+        return text, ""
+    cut = text.rfind("\n", limit // 2, limit)
+    if cut < 0:
+        cut = limit
+    return text[:cut], text[cut:].lstrip("\n")
+
+
+async def send_long(channel, text):
+    """ 非串流版：超過 2000 字就拆成多則送出 """
+    while text:
+        head, text = split_message(text)
+        await channel.send(head)
+
+
+async def stream_reply(channel, chunks, edit_interval=1.0):
+    """ 把 LLM 串流 (async iterator) 邊收邊顯示在頻道裡，回傳首字延遲 / 總耗時等統計 """
+    start = time.perf_counter()
+    first_token_at = None
+    current = await channel.send(PLACEHOLDER)
+    messages = 1
+    text = ""       # 目前這則訊息應該顯示的內容
+    shown = None    # 上次實際編輯上去的內容
+    last_edit = time.perf_counter()
+    parts = []      # 完整回覆 (給對話記憶用)
+
+    try:
+        async for delta in chunks:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            text += delta
+            parts.append(delta)
+
+            # 超過上限：目前這則定稿，開新的一則
+            while len(text) > DISCORD_LIMIT:
+                head, text = split_message(text)
+                await current.edit(content=head)
+                current = await channel.send("…")
+                messages += 1
+                shown = None
+                last_edit = time.perf_counter()
+
+            if text and text != shown and time.perf_counter() - last_edit >= edit_interval:
+                await current.edit(content=text)
+                shown = text
+                last_edit = time.perf_counter()
+    except Exception:
+        # 串到一半斷掉 (逾時 / 5xx / 備用模型也失敗)：把已經收到的字留在訊息上並標記中斷，不要卡在「思考中」
+        marked = f"{text}\n{INTERRUPTED}" if text else INTERRUPTED
+        try:
+            await current.edit(content=marked if len(marked) <= DISCORD_LIMIT else text)
+        except Exception:
+            pass  # 連編輯都失敗就算了，把原本的錯丟出去
+        raise
+
+    if not parts:
+        text = "（AI 沒有回應）"
+    if text and text != shown:
+        await current.edit(content=text)
+
+    end = time.perf_counter()
+    return {
+        "ttft": (first_token_at - start) if first_token_at else None,
+        "total": end - start,
+        "chars": sum(len(part) for part in parts),
+        "text": "".join(parts),
+        "messages": messages,
+    }
@@ -0,0 +1,104 @@
+import time
+
+import storage
+
+# ================= 客服單登記簿 =================
+# 記錄「哪個伺服器的哪個人開了哪個客服單頻道」，存在 SQLite，啟動時一次載入。
+# 檢查重複開單只要查 dict，不用再拿顯示名稱去所有頻道裡比對 (改名就會失效)。
+# 頻道被刪掉時由 on_guild_channel_delete 同步移除。
+#
+# 另外記錄「還掛著紅色臨時按鈕」的客服單 (通常只有少數幾個)，
+# on_message 只要查這個小 dict，一般頻道完全不用跑客服單邏輯。
+# 查詢都在記憶體；寫回資料庫丟給 storage 的寫入器，不在事件迴圈上等寫入鎖。
+
+PANEL = "panel"    # 新版：紅色區塊在整合面板裡，要編輯掉
+LEGACY = "legacy"  # 舊版：紅色按鈕是獨立的一則訊息，直接刪
+
+
+class TicketRegistry:
+    def __init__(self, conn):
+        self.conn = conn
+        self.writer = storage.writer_for(conn)
+        self._by_owner = {}    # (guild_id, user_id) -> channel_id
+        self._by_channel = {}  # channel_id -> (guild_id, user_id)
+        self._temp_buttons = {}  # channel_id -> (owner_id, message_id, layout)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tickets (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL UNIQUE,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_temp_buttons (
+                channel_id INTEGER PRIMARY KEY,
+                owner_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                layout TEXT
+            )
+        """)
+        for guild_id, user_id, channel_id in conn.execute("SELECT guild_id, user_id, channel_id FROM tickets"):
+            self._by_owner[(guild_id, user_id)] = channel_id
+            self._by_channel[channel_id] = (guild_id, user_id)
+        for channel_id, owner_id, message_id, layout in conn.execute("SELECT * FROM ticket_temp_buttons"):
+            self._temp_buttons[channel_id] = (owner_id, message_id, layout)
+
+    def get(self, guild_id, user_id):
+        """ 這個人在這個伺服器的客服單頻道 ID，沒有就是 None """
+        return self._by_owner.get((guild_id, user_id))
+
+    def owner_of(self, channel_id):
+        owner = self._by_channel.get(channel_id)
+        return owner[1] if owner else None
+
+    def add(self, guild_id, user_id, channel_id):
+        self.remove_channel(self._by_owner.get((guild_id, user_id)))
+        self._by_owner[(guild_id, user_id)] = channel_id
+        self._by_channel[channel_id] = (guild_id, user_id)
+        self.writer.execute(
+            "INSERT OR REPLACE INTO tickets (guild_id, user_id, channel_id, created_at) VALUES (?, ?, ?, ?)",
+            (guild_id, user_id, channel_id, time.time()),
+        )
+
+    def set_temp_button(self, channel_id, owner_id, message_id, layout=PANEL):
+        """ layout 為 None 代表不確定 (升級前留下來的)，移除時要先抓訊息看一下 """
+        self._temp_buttons[channel_id] = (owner_id, message_id, layout)
+        self.writer.execute(
+            "INSERT OR REPLACE INTO ticket_temp_buttons (channel_id, owner_id, message_id, layout) VALUES (?, ?, ?, ?)",
+            (channel_id, owner_id, message_id, layout),
+        )
+
+    def pop_temp_button(self, channel_id, author_id):
+        """ 開單者在自己的客服單發言時回傳 (message_id, layout) 並移除登記，其他情況回傳 None """
+        pending = self._temp_buttons.get(channel_id)
+        if pending is None or pending[0] != author_id:
+            return None
+        self._discard_temp_button(channel_id)
+        return pending[1], pending[2]
+
+    def _discard_temp_button(self, channel_id):
+        if self._temp_buttons.pop(channel_id, None) is not None:
+            self.writer.execute("DELETE FROM ticket_temp_buttons WHERE channel_id = ?", (channel_id,))
+
+    @property
+    def pending_temp_buttons(self):
+        return len(self._temp_buttons)
+
+    def remove_channel(self, channel_id):
+        self._discard_temp_button(channel_id)
+        owner = self._by_channel.pop(channel_id, None)
+        if owner is None:
+            return False
+        self._by_owner.pop(owner, None)
+        self.writer.execute("DELETE FROM tickets WHERE channel_id = ?", (channel_id,))
+        return True
+
+    def remove_guild(self, guild_id):
+        for channel_id, owner in list(self._by_channel.items()):
+            if owner[0] == guild_id:
+                self.remove_channel(channel_id)
+
+    def __len__(self):
+        return len(self._by_owner)
@@ -0,0 +1,75 @@
+# ================= 頻道主題索引 =================
+# 頻道的用途都是靠 channel.topic 標記的。與其每次都把所有伺服器 × 所有頻道掃一遍，
+# 不如在上線時建一次索引，之後靠頻道建立/修改/刪除事件維護，查詢都是 O(1)。
+
+GAME = "game"
+AI = "ai"
+STORY_OUTPUT = "story_output"
+STORY_TEST = "story_test"
+TICKET_PANEL = "ticket_panel"
+
+STORY_TOPIC = "【故事專用】每天早上8點，擷取過去24小時內接龍頻道的所有詞彙，編成一個故事。"
+
+TOPIC_ROLES = {
+    "【接龍模式】": GAME,
+    "【AI聊天模式】": AI,
+    STORY_TOPIC: STORY_OUTPUT,
+    "【故事測試】": STORY_TEST,
+    "【請勿濫用客服單】": TICKET_PANEL,
+}
+
+
+class TopicIndex:
+    def __init__(self):
+        self._roles = {}     # channel_id -> role
+        self._channels = {}  # role -> guild_id -> {channel_id: channel}
+
+    def build(self, guilds):
+        """ 上線時掃一次所有頻道，之後就靠事件更新 """
+        self._roles.clear()
+        self._channels.clear()
+        for guild in guilds:
+            self.add_guild(guild)
+
+    def add_guild(self, guild):
+        for channel in guild.text_channels:
+            self.update(channel)
+
+    def remove_guild(self, guild):
+        for by_guild in self._channels.values():
+            for channel_id in by_guild.pop(guild.id, {}):
+                self._roles.pop(channel_id, None)
+
+    def update(self, channel):
+        """ 頻道新增或修改 (主題可能變了) 時呼叫 """
+        self.remove(channel)
+        role = TOPIC_ROLES.get(getattr(channel, "topic", None))
+        if role is None:
+            return
+        self._roles[channel.id] = role
+        self._channels.setdefault(role, {}).setdefault(channel.guild.id, {})[channel.id] = channel
+
+    def remove(self, channel):
+        role = self._roles.pop(channel.id, None)
+        if role is None:
+            return
+        by_guild = self._channels[role]
+        channels = by_guild.get(channel.guild.id, {})
+        channels.pop(channel.id, None)
+        if not channels:
+            by_guild.pop(channel.guild.id, None)
+
+    def role_of(self, channel_id):
+        return self._roles.get(channel_id)
+
+    def channels(self, role, guild_id=None):
+        """ 指定用途的頻道；不給 guild_id 就回傳所有伺服器的 """
+        by_guild = self._channels.get(role, {})
+        if guild_id is not None:
+            return list(by_guild.get(guild_id, {}).values())
+        return [channel for channels in by_guild.values() for channel in channels.values()]
+
+    def first(self, role, guild_id):
+        for channel in self._channels.get(role, {}).get(guild_id, {}).values():
+            return channel
+        return None
@@ -0,0 +1,105 @@
+import time
+import unicodedata
+from collections import OrderedDict
+
+import storage
+
+# ================= 接龍裁判快取 =================
+# 同一個詞被判過一次就記下來 (YES/NO + 酸人的理由)，跨頻道、跨伺服器共用，
+# 重啟後從資料庫載回。key = (正規化後的詞, prompt 版本)，改了 prompt 就換版本號，
+# 舊的判決自然不會再被用到。
+# 記憶體沒命中時會再查一次資料庫，多個 shard 行程共用同一個檔案就能共用判決。
+# 記憶體最多 max_entries 筆 (LRU)；資料庫不跟著記憶體刪，只在過期 (ttl) 時清掉。
+# 寫入都丟給 storage 的寫入器，不在事件迴圈上等別的 shard 的寫入鎖。
+
+
+def normalize_word(word):
+    """ 全形/半形統一、去掉所有空白 """
+    return "".join(unicodedata.normalize("NFKC", word).split())
+
+
+class VerdictCache:
+    def __init__(self, conn, max_entries=50000, ttl=30 * 86400):
+        self.conn = conn
+        self.writer = storage.writer_for(conn)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (word, version) -> (ok, reason, created_at)，越後面越新
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS verdict_cache (
+                word TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                ok INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (word, prompt_version)
+            )
+        """)
+        self._load()
+
+    def _load(self):
+        cutoff = time.time() - self.ttl
+        self.writer.execute("DELETE FROM verdict_cache WHERE created_at < ?", (cutoff,))
+        rows = self.conn.execute(
+            "SELECT word, prompt_version, ok, reason, created_at FROM verdict_cache "
+            "ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for word, version, ok, reason, created_at in reversed(rows):
+            self._entries[(word, version)] = (bool(ok), reason, created_at)
+
+    def get(self, word, version):
+        """ 命中回傳 (ok, reason)，沒有或過期回傳 None """
+        key = (normalize_word(word), version)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._read_through(key)
+        if entry is None or entry[2] < time.time() - self.ttl:
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def _read_through(self, key):
+        """ 記憶體裡沒有就查資料庫 (可能是別的 shard 判過的)，查到就放進記憶體 """
+        row = self.conn.execute(
+            "SELECT ok, reason, created_at FROM verdict_cache WHERE word = ? AND prompt_version = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        entry = self._entries[key] = (bool(row[0]), row[1], row[2])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)  # 只是擠出記憶體，資料庫裡的留著
+        return entry
+
+    def put(self, word, version, ok, reason=""):
+        key = (normalize_word(word), version)
+        now = time.time()
+        self._entries[key] = (ok, reason, now)
+        self._entries.move_to_end(key)
+        self.writer.execute(
+            "INSERT OR REPLACE INTO verdict_cache (word, prompt_version, ok, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+            (key[0], version, int(ok), reason, now),
+        )
+        while len(self._entries) > self.max_entries:
+            # 跟 _read_through 一樣只擠出記憶體：資料庫是所有 shard 共用的，別的行程可能還在用這筆
+            self._entries.popitem(last=False)
+
+    def _discard(self, key):
+        """ 過期的判決：記憶體和資料庫都刪掉 (資料庫的大小靠過期清掉，不靠記憶體上限) """
+        self._entries.pop(key, None)
+        self.writer.execute("DELETE FROM verdict_cache WHERE word = ? AND prompt_version = ?", key)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,86 @@
+import storage
+
+# ================= 接龍詞彙紀錄 =================
+# 每個被 ✅ 的詞 (連同作者、時間) 都追加寫進這張表，編輯/刪除也各記一筆，
+# 只新增不修改。每日故事直接用 (channel_id, created_at) 索引撈一段時間範圍，
+# 不用再去 Discord 一頁一頁翻歷史訊息。
+# 寫入丟給 storage 的寫入器 (依序寫、不擋事件迴圈)，剛追加的那幾筆要等一下下才查得到。
+
+ACCEPT = "accept"
+EDIT = "edit"
+DELETE = "delete"
+
+# 編輯過的詞取最新內容；被刪掉的詞不算
+_CURRENT_CONTENT = f"""COALESCE(
+    (SELECT e.content FROM word_events e WHERE e.message_id = a.message_id AND e.kind = '{EDIT}' ORDER BY e.id DESC LIMIT 1),
+    a.content)"""
+_NOT_DELETED = f"NOT EXISTS (SELECT 1 FROM word_events d WHERE d.message_id = a.message_id AND d.kind = '{DELETE}')"
+
+
+class WordLog:
+    def __init__(self, conn):
+        self.conn = conn
+        self.writer = storage.writer_for(conn)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS word_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                guild_id INTEGER,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                author_id INTEGER,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS word_events_channel_time ON word_events (channel_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS word_events_message ON word_events (message_id, kind)")
+
+    def append(self, kind, channel_id, message_id, content, created_at, guild_id=None, author_id=None):
+        """ created_at 可以是 datetime 或 unix timestamp """
+        if hasattr(created_at, "timestamp"):
+            created_at = created_at.timestamp()
+        self.writer.execute(
+            "INSERT INTO word_events (kind, guild_id, channel_id, message_id, author_id, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, guild_id, channel_id, message_id, author_id, content, created_at),
+        )
+
+    def accepted_words(self, channel_id, since, until=None):
+        """ 回傳某段時間內通過的詞 [(內容, 作者ID, 時間戳)]，由舊到新；被刪掉的不算，被編輯的取最新內容 """
+        if hasattr(since, "timestamp"):
+            since = since.timestamp()
+        if until is None:
+            until = float("inf")
+        elif hasattr(until, "timestamp"):
+            until = until.timestamp()
+        return self.conn.execute(f"""
+            SELECT {_CURRENT_CONTENT}, a.author_id, a.created_at
+            FROM word_events a
+            WHERE a.kind = '{ACCEPT}' AND a.channel_id = ? AND a.created_at >= ? AND a.created_at < ?
+              AND {_NOT_DELETED}
+            ORDER BY a.created_at
+        """, (channel_id, since, until)).fetchall()
+
+    def recent_words(self, channel_ids, limit=10):
+        """ 從多個頻道撈最新的 limit 個通過的詞 (由新到舊) """
+        if not channel_ids:
+            return []
+        marks = ", ".join("?" * len(channel_ids))
+        return self.conn.execute(f"""
+            SELECT {_CURRENT_CONTENT}, a.author_id, a.created_at
+            FROM word_events a
+            WHERE a.kind = '{ACCEPT}' AND a.channel_id IN ({marks}) AND {_NOT_DELETED}
+            ORDER BY a.created_at DESC
+            LIMIT ?
+        """, (*channel_ids, limit)).fetchall()
+
+    def recent_accepted(self, channel_id, limit):
+        """ 某個頻道最新的 limit 個通過的詞 [(訊息ID, 內容, 作者ID)] (由新到舊)，給通過詞索引重啟後補資料用 """
+        return self.conn.execute(f"""
+            SELECT a.message_id, {_CURRENT_CONTENT}, a.author_id
+            FROM word_events a
+            WHERE a.kind = '{ACCEPT}' AND a.channel_id = ? AND {_NOT_DELETED}
+            ORDER BY a.created_at DESC
+            LIMIT ?
+        """, (channel_id, limit)).fetchall()